@@ -212,6 +212,17 @@ def main():
             # Collect platforms that just went live or offline in this check cycle
             platforms_went_live = []
             platforms_went_offline = []
+            platforms_still_live = []
+            
+            # Platforms that can check several channels per request answer up front
+            batched_results = {}
+            for platform in enabled_streaming:
+                is_live_batch = getattr(platform, 'is_live_batch', None)
+                if not is_live_batch:
+                    continue
+                usernames = [s.username for s in stream_statuses.values() if s.platform_name == platform.name]
+                for username, result in is_live_batch(usernames).items():
+                    batched_results[f"{platform.name}/{username}"] = result
             
             # Check all streaming platforms (iterate over each stream status)
             for status_key, status in stream_statuses.items():
@@ -221,7 +232,10 @@ def main():
                     continue
                 
                 # Check if stream is live (returns is_live bool and stream_data dict)
-                is_live, stream_data = platform.is_live(status.username)
+                if status_key in batched_results:
+                    is_live, stream_data = batched_results[status_key]
+                else:
+                    is_live, stream_data = platform.is_live(status.username)
                 
                 # Update status and check if state changed
                 state_changed = status.update(is_live, stream_data)
@@ -237,14 +251,20 @@ def main():
                     if status.state == StreamState.LIVE:
                         logger.debug(f"  {status.platform_name}/{status.username}: Still live ({status.consecutive_live_checks} checks)")
                         
-                        # Update Discord embeds with fresh stream data (viewer count, thumbnail)
-                        for social in enabled_social:
-                            if isinstance(social, DiscordPlatform) and status.stream_data:
-                                if social.update_stream(status.platform_name, status.stream_data, status.url):
-                                    logger.info(f"  ✓ Updated Discord embed for {status.platform_name}/{status.username} (viewers: {status.stream_data.get('viewer_count', 'N/A')})")
+                        if status.stream_data:
+                            platforms_still_live.append(status)
                     else:
                         logger.debug(f"  {status.platform_name}/{status.username}: Still offline ({status.consecutive_offline_checks} checks)")
             
+            # Update Discord embeds with fresh stream data (viewer count, thumbnail) -
+            # queued in the background so a slow webhook doesn't hold up the check loop
+            if platforms_still_live:
+                updates = [(s.platform_name, s.stream_data, s.url) for s in platforms_still_live]
+                for social in enabled_social:
+                    if isinstance(social, DiscordPlatform):
+                        queued = social.queue_updates(updates)
+                        logger.debug(f"  Queued {queued} Discord embed update(s)")
+            
             # ================================================================
             # HANDLE PLATFORMS THAT WENT LIVE
             # ================================================================
@@ -509,6 +529,12 @@ def main():
             
         except KeyboardInterrupt:
             logger.info("\n👋 Stream Daemon stopped by user")
+            # Release pooled HTTP connections for platforms that keep them
+            for platform in [*enabled_streaming, *enabled_social]:
+                close = getattr(platform, 'close', None)
+                if close:
+                    close()
+            BlueskyPlatform.close_shared_session()
             sys.exit(0)
         except Exception as e:
             logger.error(f"💥 Unexpected error: {e}")
@@ -1,6 +1,6 @@
 """Configuration and secrets management."""
 
-from .secrets import load_secrets_from_aws, load_secrets_from_vault, load_secrets_from_doppler, get_secret
+from .secrets import load_secrets_from_aws, load_secrets_from_vault, load_secrets_from_doppler, get_secret, clear_secrets_cache
 from .config import get_config, get_bool_config, get_int_config, get_usernames
 
 __all__ = [
@@ -8,6 +8,7 @@ __all__ = [
     'load_secrets_from_vault', 
     'load_secrets_from_doppler',
     'get_secret',
+    'clear_secrets_cache',
     'get_config',
     'get_bool_config',
     'get_int_config',
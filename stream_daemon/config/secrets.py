@@ -15,8 +15,45 @@ import hvac
 import boto3
 from dopplersdk import DopplerSDK
 
+from stream_daemon.utils.cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
+# Authenticating a platform asks for 3-9 keys out of the same secret bundle, and
+# every one of those used to be a full round trip to AWS/Vault/Doppler. Keep the
+# bundles briefly so a rotated secret still shows up within a few minutes.
+_SECRETS_CACHE_TTL = 300
+_SECRETS_CACHE = TTLCache(maxsize=64, ttl=_SECRETS_CACHE_TTL)
+
+
+def clear_secrets_cache():
+    """Forget every cached secret bundle so the next lookup hits the backend again."""
+    _SECRETS_CACHE.clear()
+
+
+def _cached_bundle(backend, name, loader):
+    """
+    Return a secret bundle, loading it through loader() on a cache miss.
+
+    Empty results (backend errors, typo'd names) are not cached, so a flaky
+    secrets manager gets retried on the next lookup instead of sticking.
+
+    Args:
+        backend: Backend name, part of the cache key ('aws', 'vault', 'doppler')
+        name: Secret name/path, the other part of the cache key
+        loader: Zero-argument callable that fetches the bundle
+
+    Returns:
+        Dict of secrets (possibly empty)
+    """
+    cache_key = (backend, name)
+    secrets = _SECRETS_CACHE.get(cache_key)
+    if secrets is None:
+        secrets = loader()
+        if secrets:
+            _SECRETS_CACHE.set(cache_key, secrets)
+    return secrets
+
 
 def load_secrets_from_aws(secret_name):
     """
@@ -132,6 +169,30 @@ def load_secrets_from_doppler(secret_name):
         return {}
 
 
+def _load_all_doppler_secrets(project, config):
+    """
+    Load every secret in a Doppler project/config, keyed by its full name.
+    
+    Args:
+        project: Doppler project
+        config: Doppler config (e.g., 'prd')
+        
+    Returns:
+        Dict of SECRET_NAME -> value, or empty dict on error
+    """
+    try:
+        sdk = DopplerSDK()
+        sdk.set_access_token(os.getenv('DOPPLER_TOKEN'))
+        secrets_response = sdk.secrets.list(project=project, config=config)
+        if not hasattr(secrets_response, 'secrets'):
+            return {}
+        return {name: value.get('computed', value.get('raw', ''))
+                for name, value in secrets_response.secrets.items()}
+    except Exception as e:
+        logger.debug(f"Direct Doppler secret listing failed: {type(e).__name__}")
+        return {}
+
+
 def get_secret(platform, key, secret_name_env=None, secret_path_env=None, doppler_secret_env=None):
     """
     Get a secret value with priority:
@@ -156,31 +217,21 @@ def get_secret(platform, key, secret_name_env=None, secret_path_env=None, dopple
         if os.getenv('DOPPLER_TOKEN') and doppler_secret_env:
             secret_name = os.getenv(doppler_secret_env)
             if secret_name:
-                secrets = load_secrets_from_doppler(secret_name)
+                secrets = _cached_bundle('doppler', secret_name,
+                                         lambda: load_secrets_from_doppler(secret_name))
                 secret_value = secrets.get(key)
                 if secret_value:
                     return secret_value
                 
                 # Special case: For keys like GEMINI_API_KEY that aren't prefixed in Doppler,
                 # try getting the direct key (GEMINI_API_KEY) from all Doppler secrets
-                try:
-                    doppler_token = os.getenv('DOPPLER_TOKEN')
-                    if doppler_token:
-                        doppler_project = os.getenv('DOPPLER_PROJECT', 'stream-daemon')
-                        doppler_config = os.getenv('DOPPLER_CONFIG', 'prd')
-                        
-                        sdk = DopplerSDK()
-                        sdk.set_access_token(doppler_token)
-                        secrets_response = sdk.secrets.list(project=doppler_project, config=doppler_config)
-                        
-                        if hasattr(secrets_response, 'secrets'):
-                            # Try direct key lookup (e.g., GEMINI_API_KEY)
-                            direct_key = key.upper()
-                            if direct_key in secrets_response.secrets:
-                                return secrets_response.secrets[direct_key].get('computed', 
-                                       secrets_response.secrets[direct_key].get('raw', ''))
-                except Exception as e:
-                    logger.debug(f"Direct key lookup failed for {key}: {e}")
+                doppler_project = os.getenv('DOPPLER_PROJECT', 'stream-daemon')
+                doppler_config = os.getenv('DOPPLER_CONFIG', 'prd')
+                all_secrets = _cached_bundle('doppler-all', (doppler_project, doppler_config),
+                                             lambda: _load_all_doppler_secrets(doppler_project, doppler_config))
+                direct_value = all_secrets.get(key.upper())
+                if direct_value:
+                    return direct_value
         
         # Check which secrets manager is enabled (for AWS/Vault)
         secret_manager = os.getenv('SECRETS_MANAGER', 'none').lower()
@@ -189,7 +240,8 @@ def get_secret(platform, key, secret_name_env=None, secret_path_env=None, dopple
         if secret_manager == 'aws' and secret_name_env:
             secret_name = os.getenv(secret_name_env)
             if secret_name:
-                secrets = load_secrets_from_aws(secret_name)
+                secrets = _cached_bundle('aws', secret_name,
+                                         lambda: load_secrets_from_aws(secret_name))
                 secret_value = secrets.get(key)
                 if secret_value:
                     return secret_value
@@ -198,7 +250,8 @@ def get_secret(platform, key, secret_name_env=None, secret_path_env=None, dopple
         elif secret_manager == 'vault' and secret_path_env:
             secret_path = os.getenv(secret_path_env)
             if secret_path:
-                secrets = load_secrets_from_vault(secret_path)
+                secrets = _cached_bundle('vault', secret_path,
+                                         lambda: load_secrets_from_vault(secret_path))
                 secret_value = secrets.get(key)
                 if secret_value:
                     return secret_value
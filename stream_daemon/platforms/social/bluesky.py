@@ -11,43 +11,364 @@ but it's OUR round. It's open source round. It's federated round. It's still a g
 
 import logging
 import re
-from typing import Optional
-from urllib.parse import urlparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+import httpx
+import requests
 from atproto import Client, models, client_utils
+from atproto import exceptions as atproto_exceptions
+from urllib3.util.retry import Retry
 from stream_daemon.config import get_config, get_bool_config, get_secret
+from stream_daemon.utils import TTLCache, create_session
 
 logger = logging.getLogger(__name__)
 
+# Rich text tokens: http(s) URLs become links, #words become clickable tags
+_URL_OR_TAG_RE = re.compile(r'(https?://\S+|#\w+)')
+# Just the URLs - the first one becomes the embed card
+_URL_RE = re.compile(r'https?://\S+')
 
-def _is_url_for_domain(url: str, domain: str) -> bool:
+# Browser-ish headers for thumbnail and Open Graph fetches
+_BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+}
+_SCRAPE_HEADERS = {
+    **_BROWSER_HEADERS,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+# Pooled HTTP session for thumbnails and Open Graph scraping, shared by every
+# Bluesky account so TLS stays warm to the same CDNs between posts. Transient
+# connection failures get two quick retries before the card is given up on.
+_HTTP = create_session(
+    headers=_BROWSER_HEADERS,
+    pool_connections=10,
+    pool_maxsize=20,
+    retries=Retry(total=2, backoff_factor=0.5),
+)
+
+# Link cards only need the <head>; stop reading a page after this many bytes
+_MAX_HTML_BYTES = 64 * 1024
+_HEAD_END = b'</head>'
+
+# Bluesky rejects link card thumbnails over ~1MB; don't download (or upload) anything bigger
+_MAX_THUMB_BYTES = 1_000_000
+
+# Streaming platform domains whose links get cards built from live stream metadata
+_STREAM_DOMAINS = {
+    'kick.com': 'kick',
+    'twitch.tv': 'twitch',
+    'youtube.com': 'youtube',
+    'youtu.be': 'youtube',
+}
+
+# One scan classifies a URL: optional userinfo, any subdomains, then a known
+# streaming domain that must end the host (so twitch.tv.evil.com doesn't match)
+_STREAM_HOST_RE = re.compile(
+    r'^https?://(?:[^/?#@]*@)?(?:[^/?#@]+\.)?('
+    + '|'.join(re.escape(domain) for domain in _STREAM_DOMAINS)
+    + r')\.?(?::\d*)?(?:[/?#]|$)',
+    re.IGNORECASE
+)
+
+# Card title for streaming platform links when the stream itself has none
+_STREAM_CARD_TITLES = {
+    'kick': 'Live on Kick',
+    'twitch': 'Live Stream',
+    'youtube': 'Live Stream',
+}
+
+# Streaming platforms that block automated requests (CloudFlare etc.) - never scrape these for link cards
+_SCRAPE_BLOCKLIST = frozenset({'kick'})
+
+# Scraped Open Graph metadata (title, description, image URL) - the same for every account.
+# Optionally persisted to BLUESKY_EMBED_CACHE_FILE so a restart doesn't re-scrape everything.
+_OG_CACHE = TTLCache(maxsize=256, ttl=600)
+_og_cache_loaded = False
+
+# How long an uploaded thumbnail blob is reused for the same image URL
+_BLOB_CACHE_TTL = 3600  # seconds
+
+# Longest we'll hold a post waiting on its thumbnail before sending a text-only card
+_THUMB_UPLOAD_TIMEOUT = 15  # seconds
+
+# Reply references by parent post URI - posts are immutable, so these never go stale
+_REPLY_REF_CACHE = TTLCache(maxsize=1024, ttl=3600)
+
+# Attempts for Bluesky API calls that hit transient errors (backoff: 1s, 2s)
+_API_ATTEMPTS = 3
+
+
+def _stream_platform_for_url(url: str) -> Optional[str]:
     """
-    Safely check if a URL is for a specific domain.
+    Classify a URL as one of the streaming platforms we build cards for.
     
     Args:
-        url: The URL to check
-        domain: The domain to match (e.g., 'kick.com', 'twitch.tv')
+        url: The URL to classify
     
     Returns:
-        True if the URL's hostname matches or is a subdomain of the domain
+        'kick', 'twitch', 'youtube', or None for any other site
+    """
+    match = _STREAM_HOST_RE.match(url)
+    return _STREAM_DOMAINS[match.group(1).lower()] if match else None
+
+
+def _tokenize_rich_text(message: str) -> Tuple[List[Tuple[str, int, int]], Optional[str]]:
     """
+    Split a post into plain text, link and hashtag spans in a single pass.
+    
+    Spans are (start, end) offsets into the message rather than substrings, so
+    nothing is copied until the caller slices out what it actually emits.
+    
+    Args:
+        message: Post text
+    
+    Returns:
+        Tuple of (spans, first_url) where spans is a list of
+        ('text' | 'link' | 'tag', start, end) in message order and first_url is
+        the first http(s) URL (used for the embed card) or None
+    """
+    # Plain-text replies are common; two substring checks beat spinning up the regex
+    if '#' not in message and 'http' not in message:
+        return ([('text', 0, len(message))] if message else []), None
+    
+    spans = []
+    append = spans.append
+    last_pos = 0
+    
+    for match in _URL_OR_TAG_RE.finditer(message):
+        start, end = match.span()
+        # Text before URL/hashtag (never emit empty text spans)
+        if start > last_pos:
+            append(('text', last_pos, start))
+        append(('tag' if message[start] == '#' else 'link', start, end))
+        last_pos = end
+    
+    # Any remaining text after last URL/hashtag
+    if last_pos < len(message):
+        append(('text', last_pos, len(message)))
+    
+    # One extra C-level search is cheaper than tracking the first link inside the loop
+    first_url_match = _URL_RE.search(message)
+    return spans, first_url_match.group() if first_url_match else None
+
+
+def _load_og_cache(path: str) -> None:
+    """
+    Warm the Open Graph cache from disk, once per process.
+    
+    Args:
+        path: Cache file written by a previous run
+    """
+    global _og_cache_loaded
+    if _og_cache_loaded:
+        return
+    _og_cache_loaded = True
     try:
-        parsed = urlparse(url)
-        hostname = parsed.hostname
-        if not hostname:
-            return False
-        # Check exact match or subdomain (e.g., www.kick.com matches kick.com)
-        return hostname == domain or hostname.endswith('.' + domain)
-    except Exception:
+        loaded = _OG_CACHE.load(path)
+        logger.info(f"ℹ Loaded {loaded} cached Bluesky link card(s) from {path}")
+    except FileNotFoundError:
+        # First run - nothing saved yet
+        pass
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning(f"⚠ Ignoring unreadable Bluesky embed cache {path}: {e}")
+
+
+def _build_rich_text(message: str) -> Tuple[client_utils.TextBuilder, Optional[str]]:
+    """
+    Build Bluesky rich text with explicit link and hashtag facets.
+    
+    Args:
+        message: Post text
+    
+    Returns:
+        Tuple of (text_builder, first_url) - first_url feeds the embed card
+    """
+    spans, first_url = _tokenize_rich_text(message)
+    
+    text_builder = client_utils.TextBuilder()
+    add_text, add_link, add_tag = text_builder.text, text_builder.link, text_builder.tag
+    for kind, start, end in spans:
+        if kind == 'link':
+            url = message[start:end]
+            add_link(url, url)
+        elif kind == 'tag':
+            # First param: display WITH #, Second param: tag value WITHOUT #
+            add_tag(message[start:end], message[start + 1:end])
+        else:
+            add_text(message[start:end])
+    return text_builder, first_url
+
+
+def _reply_ref_for_parent(parent_response) -> Optional[models.AppBskyFeedPost.ReplyRef]:
+    """
+    Build the thread reference for replying to a fetched parent post.
+    
+    Args:
+        parent_response: Result of get_posts for the parent URI
+    
+    Returns:
+        ReplyRef pointing at the parent and its thread root, or None if the
+        parent wasn't found
+    """
+    if not parent_response or not parent_response.posts:
+        return None
+    
+    parent_post = parent_response.posts[0]
+    
+    # Determine root: if parent has a reply, use its root, otherwise parent is root
+    parent_reply = getattr(parent_post.record, 'reply', None)
+    if parent_reply:
+        root_ref = parent_reply.root
+    else:
+        # Parent is the root - create strong ref
+        root_ref = models.create_strong_ref(parent_post)
+    
+    # Create reply reference (a post's URI/CID and thread root never change)
+    return models.AppBskyFeedPost.ReplyRef(
+        parent=models.create_strong_ref(parent_post),
+        root=root_ref
+    )
+
+
+# Once a page has given us all three of these, nothing later in it matters
+_CARD_META_KEYS = frozenset({'og:title', 'og:description', 'og:image'})
+
+
+class _StopParsing(Exception):
+    """Raised from parser callbacks to abandon the rest of the document."""
+
+
+class _MetaTagParser(HTMLParser):
+    """Collect <meta> tags keyed by their property/name attribute in a single pass."""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'body':
+            # Meta tags live in <head>; the body is just more bytes to tokenize
+            raise _StopParsing
+        if tag != 'meta':
+            return
+        attributes = dict(attrs)
+        key = attributes.get('property') or attributes.get('name')
+        content = attributes.get('content')
+        if key and content:
+            # First occurrence wins, same as a document-order search
+            self.meta.setdefault(key.lower(), content)
+            if _CARD_META_KEYS <= self.meta.keys():
+                raise _StopParsing
+    
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            raise _StopParsing
+
+
+def _parse_meta_tags(html: str) -> dict:
+    """
+    Extract <meta> tag values from an HTML document.
+    
+    Uses the stdlib HTMLParser tokenizer instead of building a full BeautifulSoup
+    tree - we only ever read a handful of meta tags from the page. Tokenizing
+    stops at the end of <head>, or as soon as the Open Graph title, description
+    and image have all been seen.
+    
+    Args:
+        html: HTML document text
+    
+    Returns:
+        Dict mapping lowercased property/name (e.g., 'og:title') to content
+    """
+    parser = _MetaTagParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except _StopParsing:
+        pass
+    return parser.meta
+
+
+def _is_transient_error(error: Exception, idempotent: bool) -> bool:
+    """
+    Decide whether a failed Bluesky API call is worth retrying.
+    
+    Args:
+        error: Exception raised by the atproto client
+        idempotent: Whether the call is safe to repeat. A write (send_post) that
+            failed after the request went out may still have landed server-side,
+            so it's only retried when it provably never reached Bluesky.
+    
+    Returns:
+        True for connection failures, 429 and (for idempotent calls) timeouts,
+        dropped connections and 5xx
+    """
+    if isinstance(error, atproto_exceptions.RequestException):
+        # Got a response: a rate-limit rejection never ran the call
+        status = getattr(error.response, 'status_code', None) or 0
+        return status == 429 or (idempotent and status >= 500)
+    # NetworkError covers timeouts, transport errors and 409/413/502 responses
+    if not isinstance(error, atproto_exceptions.NetworkError):
         return False
+    if idempotent:
+        return True
+    # Couldn't even connect - nothing was sent, so nothing can be duplicated
+    return isinstance(error.__cause__, (httpx.ConnectError, httpx.ConnectTimeout))
+
+
+def _with_retries(fn, *args, idempotent: bool = True, **kwargs):
+    """
+    Call a Bluesky API method, retrying transient failures with exponential backoff.
+    
+    Args:
+        fn: atproto client method to call
+        *args: Positional arguments for fn
+        idempotent: Whether fn is safe to repeat; False only retries failures that never reached Bluesky
+        **kwargs: Keyword arguments for fn
+    
+    Returns:
+        Whatever fn returns
+    
+    Raises:
+        The last error, once attempts run out or the error isn't transient
+    """
+    for attempt in range(_API_ATTEMPTS):
+        try:
+            return fn(*args, **kwargs)
+        except atproto_exceptions.AtProtocolError as e:
+            if attempt == _API_ATTEMPTS - 1 or not _is_transient_error(e, idempotent):
+                raise
+            delay = 2 ** attempt
+            logger.warning(f"⚠ Bluesky API error (attempt {attempt + 1}/{_API_ATTEMPTS}): {e}. Retrying in {delay}s...")
+            time.sleep(delay)
 
 
 class BlueskyPlatform:
     """Bluesky social platform with threading support."""
     
+    # Logged-in clients by handle, shared by every instance so re-creating the
+    # platform (config reloads, tests, scripts) doesn't log in from scratch
+    _client_pool = {}
+    _client_pool_lock = threading.Lock()
+    
     def __init__(self):
         self.name = "Bluesky"
         self.enabled = False
         self.client = None
+        self._http = _HTTP
+        # image_url -> uploaded thumbnail blob; blobs belong to the account, so one cache per instance
+        self._blob_cache = TTLCache(maxsize=256, ttl=_BLOB_CACHE_TTL)
+        self.embed_cards_enabled = True
+        self._og_cache_file = None
+        # Thumbnail uploads and reply-parent lookups run here while the post is put together.
+        # Only leaf tasks go on this pool (nothing waits on it from inside it), so it can't deadlock.
+        self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='bluesky-io')
         
     def authenticate(self):
         if not get_bool_config('Bluesky', 'enable_posting', default=False):
@@ -59,268 +380,376 @@ class BlueskyPlatform:
                                   secret_path_env='SECRETS_VAULT_BLUESKY_SECRET_PATH',
                                   doppler_secret_env='SECRETS_DOPPLER_BLUESKY_SECRET_NAME')
         
-        if not all([handle, app_password]):
+        if not (handle and app_password):
             return False
+        
+        # Link cards cost a page scrape + blob upload per post; operators can opt out
+        self.embed_cards_enabled = get_bool_config('Bluesky', 'enable_embed_cards', default=True)
+        self._og_cache_file = get_config('Bluesky', 'embed_cache_file')
+        if self._og_cache_file:
+            _load_og_cache(self._og_cache_file)
+            
+        with self._client_pool_lock:
+            client = self._client_pool.get(handle)
+            if client is not None:
+                self.client = client
+                self.enabled = True
+                logger.info("✓ Bluesky authenticated (reusing session)")
+                return True
             
+            try:
+                client = Client()
+                client.login(handle, app_password)
+                self._client_pool[handle] = client
+                self.client = client
+                self.enabled = True
+                logger.info("✓ Bluesky authenticated")
+                return True
+            except Exception as e:
+                logger.warning(f"✗ Bluesky authentication failed: {e}")
+                return False
+    
+    @classmethod
+    def reset_pool(cls):
+        """Forget every pooled Bluesky client (forces a fresh login on next authenticate)."""
+        with cls._client_pool_lock:
+            cls._client_pool.clear()
+    
+    def _fetch_html_head(self, url: str) -> str:
+        """
+        Download just enough of a page to read its <head> meta tags.
+        
+        Streams the response and stops at the first </head> or after
+        _MAX_HTML_BYTES, so a 2MB YouTube watch page costs us ~64KB.
+        
+        Args:
+            url: Page URL to fetch
+        
+        Returns:
+            Decoded (possibly truncated) HTML
+        
+        Raises:
+            requests.HTTPError: For 4xx/5xx responses
+        """
+        # Fetch the page with a realistic browser User-Agent
+        # Leaving the with block closes the response. A fully read page hands its connection
+        # back to the pool; if we stopped at </head>, urllib3 drops the connection instead -
+        # a fresh handshake next time is cheaper than downloading the rest of a 2MB page
+        with self._http.get(url, headers=_SCRAPE_HEADERS, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            buf = bytearray()
+            for chunk in response.iter_content(chunk_size=8192):
+                # Only scan the new bytes (plus enough of the old ones to catch a tag split across chunks)
+                scan_from = max(len(buf) - (len(_HEAD_END) - 1), 0)
+                buf.extend(chunk)
+                if buf.find(_HEAD_END, scan_from) != -1 or len(buf) >= _MAX_HTML_BYTES:
+                    break
+        
+        # requests assumes ISO-8859-1 for text/html without a charset; most pages are UTF-8
+        content_type = response.headers.get('content-type', '')
+        encoding = response.encoding if 'charset=' in content_type.lower() else 'utf-8'
+        return buf.decode(encoding or 'utf-8', errors='replace')
+    
+    def _download_thumbnail(self, url: str, headers: Optional[dict] = None) -> Optional[bytes]:
+        """
+        Download a link card thumbnail, refusing anything Bluesky won't accept.
+        
+        Checks Content-Type and Content-Length before reading the body, and
+        stops streaming once _MAX_THUMB_BYTES is exceeded (servers lie, or
+        don't send a length at all).
+        
+        Args:
+            url: Image URL
+            headers: Optional extra request headers
+        
+        Returns:
+            Image bytes, or None if the response isn't a usable image
+        """
+        # Leaving the with block releases the connection, however far we read
+        with self._http.get(url, headers=headers, timeout=10, stream=True) as response:
+            if response.status_code != 200:
+                return None
+            
+            # Servers love answering image URLs with an HTML error page
+            content_type = response.headers.get('Content-Type', '')
+            if not content_type.lower().startswith('image/'):
+                logger.warning(f"⚠ Thumbnail is not an image ({content_type or 'no content type'}), skipping: {url}")
+                return None
+            
+            content_length = response.headers.get('Content-Length')
+            if content_length and content_length.isdigit() and int(content_length) > _MAX_THUMB_BYTES:
+                logger.warning(f"⚠ Thumbnail too large ({int(content_length):,} bytes), skipping: {url}")
+                return None
+            
+            buf = bytearray()
+            for chunk in response.iter_content(chunk_size=65536):
+                buf.extend(chunk)
+                if len(buf) > _MAX_THUMB_BYTES:
+                    # A truncated image is useless - skip it rather than upload garbage
+                    logger.warning(f"⚠ Thumbnail exceeds {_MAX_THUMB_BYTES:,} bytes, skipping: {url}")
+                    return None
+            return bytes(buf)
+    
+    def _upload_thumbnail(self, url: str, headers: Optional[dict] = None, cache: bool = False):
+        """
+        Download a thumbnail and upload it to Bluesky as a blob.
+        
+        Safe to run on the I/O pool - failures are logged, never raised.
+        
+        Args:
+            url: Image URL
+            headers: Optional extra request headers for the download
+            cache: Reuse a recent upload of the same URL. Only for images whose
+                content doesn't change under a fixed URL (stream thumbnails do).
+        
+        Returns:
+            Blob reference for the embed, or None if anything went wrong
+        """
+        if cache:
+            thumb_blob = self._blob_cache.get(url)
+            if thumb_blob is not None:
+                logger.debug(f"Reusing uploaded thumbnail for {url}")
+                return thumb_blob
         try:
-            self.client = Client()
-            self.client.login(handle, app_password)
-            self.enabled = True
-            logger.info("✓ Bluesky authenticated")
-            return True
-        except Exception as e:
-            logger.warning(f"✗ Bluesky authentication failed: {e}")
-            return False
+            image_data = self._download_thumbnail(url, headers=headers)
+            if image_data:
+                # upload_blob raises on failure, so a response always carries the blob.
+                # Blobs are content-addressed, so retrying a timed-out upload is harmless.
+                thumb_blob = _with_retries(self.client.upload_blob, image_data).blob
+                if cache:
+                    self._blob_cache.set(url, thumb_blob)
+                return thumb_blob
+        except (requests.RequestException, atproto_exceptions.AtProtocolError) as img_error:
+            logger.warning(f"⚠ Could not upload thumbnail: {img_error}")
+        return None
     
-    def post(self, message: str, reply_to_id: Optional[str] = None, platform_name: Optional[str] = None, stream_data: Optional[dict] = None) -> Optional[str]:
-        if not self.enabled or not self.client:
+    def _fetch_og(self, url: str) -> Tuple[str, str, Optional[str]]:
+        """
+        Scrape link card metadata from a page, reusing recent scrapes of the same URL.
+        
+        Open Graph tags first, Twitter Card metadata as the fallback.
+        
+        Args:
+            url: Page URL
+        
+        Returns:
+            Tuple of (title, description, absolute image URL or None)
+        
+        Raises:
+            requests.RequestException: If the page can't be fetched
+        """
+        cached = _OG_CACHE.get(url)
+        if cached is not None:
+            logger.debug(f"Using cached link card metadata for {url}")
+            return cached
+        
+        # One pass over the page head collects every meta tag
+        meta = _parse_meta_tags(self._fetch_html_head(url))
+        
+        title = (meta.get('og:title') or meta.get('twitter:title') or url)[:300]
+        description = (meta.get('og:description') or meta.get('twitter:description') or '')[:1000]
+        image_url = meta.get('og:image') or meta.get('twitter:image')
+        
+        # Resolve relative image URLs ('//cdn/...', '/img/...', 'img/...') against the page
+        if image_url:
+            image_url = urljoin(url, image_url)
+        
+        result = (title, description, image_url)
+        _OG_CACHE.set(url, result)
+        if self._og_cache_file:
+            try:
+                _OG_CACHE.save(self._og_cache_file)
+            except OSError as e:
+                logger.warning(f"⚠ Could not save Bluesky embed cache to {self._og_cache_file}: {e}")
+        return result
+    
+    def _thumbnail_result(self, thumb_future):
+        """
+        Collect a thumbnail upload started on the I/O pool.
+        
+        Args:
+            thumb_future: Future from submitting _upload_thumbnail, or None
+        
+        Returns:
+            Blob reference, or None if there was no upload or it took too long
+        """
+        if thumb_future is None:
             return None
-            
         try:
-            # Bluesky has a strict 300 character limit - final safety check
-            # The AI generator should prevent this, but double-check just in case
-            # Because 300 characters is apparently the exact length needed to express
-            # "I'm streaming Valorant" in a way that respects your audience's time.
-            # Twitter had 280. Bluesky said "fuck that, we need 20 more."
-            if len(message) > 300:
-                logger.error(f"✗ CRITICAL: Message exceeds Bluesky's 300 char limit ({len(message)} chars)")
-                logger.error(f"   This should not happen - check AI generator logic!")
-                logger.error(f"   Message: {message}")
-                # Emergency truncate as last resort
-                message = message[:300]
-                logger.warning(f"   Emergency truncated to 300 chars")
+            return thumb_future.result(timeout=_THUMB_UPLOAD_TIMEOUT)
+        except FutureTimeoutError:
+            logger.warning(f"⚠ Thumbnail upload took over {_THUMB_UPLOAD_TIMEOUT}s, posting card without it")
+            return None
+    
+    def _build_stream_embed(self, url: str, stream_data: dict, fallback_title: str) -> models.AppBskyEmbedExternal.Main:
+        """
+        Build a link card from the stream metadata we already have.
+        
+        Used for streaming platform links instead of scraping the page, which is
+        both more reliable and the only option for CloudFlare-guarded Kick.
+        
+        Args:
+            url: The stream URL the card links to
+            stream_data: Stream metadata (title, thumbnail_url, game_name)
+            fallback_title: Card title if the stream has none
+        
+        Returns:
+            External embed for the post
+        """
+        # Start the thumbnail upload first - it's the slow part
+        thumbnail_url = stream_data.get('thumbnail_url')
+        thumb_future = self._io_pool.submit(self._upload_thumbnail, thumbnail_url) if thumbnail_url else None
+        
+        # Card text (no viewer count to avoid showing 0 at start)
+        title = stream_data.get('title', fallback_title)
+        title = title[:300] if title else fallback_title
+        game_name = stream_data.get('game_name', '')
+        description = f"🔴 LIVE • {game_name}" if game_name else "🔴 LIVE"
+        
+        thumb_blob = self._thumbnail_result(thumb_future)
+        
+        return models.AppBskyEmbedExternal.Main(
+            external=models.AppBskyEmbedExternal.External(
+                uri=url,
+                title=title,
+                description=description[:1000],
+                thumb=thumb_blob if thumb_blob else None
+            )
+        )
+    
+    def _build_embed(self, first_url: str, stream_data: Optional[dict]) -> Optional[models.AppBskyEmbedExternal.Main]:
+        """
+        Build the link card for a post's first URL.
+        
+        Args:
+            first_url: First URL in the post
+            stream_data: Optional stream metadata (title, thumbnail_url, game_name)
+        
+        Returns:
+            External embed, or None if the site can't (or shouldn't) be carded
+        """
+        # Classify the host once and dispatch on it
+        stream_platform = _stream_platform_for_url(first_url)
+        use_stream_data = bool(stream_data) and stream_platform in _STREAM_CARD_TITLES
+        
+        if stream_platform in _SCRAPE_BLOCKLIST and not use_stream_data:
+            # Kick.com without stream_data - blocks automated requests with CloudFlare security policies
+            # Links will still be clickable, just without embed cards
+            logger.info(f"ℹ {first_url} blocks automated requests, posting with clickable link only")
+            return None
+        
+        # Network and API failures (and metadata the embed model rejects) cost us the
+        # card, not the post. Anything else is a bug and should surface as one.
+        try:
+            # Streaming platform with stream_data - build the card from the metadata we have
+            # (more reliable than scraping, and the only option for CloudFlare-guarded Kick)
+            if use_stream_data:
+                logger.info(f"ℹ Using stream metadata for {stream_platform.capitalize()} embed")
+                return self._build_stream_embed(first_url, stream_data, _STREAM_CARD_TITLES[stream_platform])
             
-            # Use TextBuilder to create rich text with explicit links and hashtags
-            text_builder = client_utils.TextBuilder()
+            # For non-Kick URLs, scrape Open Graph metadata (threaded replies tend to
+            # link the same page, so both the scrape and the thumbnail upload are cached)
+            title, description, image_url = self._fetch_og(first_url)
             
-            # Combined pattern for URLs and hashtags
-            # URL pattern: http:// and https:// URLs
-            # Hashtag pattern: # followed by alphanumeric characters (including Unicode)
-            url_pattern = r'https?://[^\s]+'
-            hashtag_pattern = r'#\w+'
-            combined_pattern = f'({url_pattern}|{hashtag_pattern})'
+            # Upload image to Bluesky if available
+            thumb_future = None
+            if image_url:
+                thumb_future = self._io_pool.submit(self._upload_thumbnail, image_url, _SCRAPE_HEADERS, True)
+            thumb_blob = self._thumbnail_result(thumb_future)
             
-            last_pos = 0
-            first_url = None  # Track first URL for embed card
+            # Create external embed with metadata
+            return models.AppBskyEmbedExternal.Main(
+                external=models.AppBskyEmbedExternal.External(
+                    uri=first_url,
+                    title=title,
+                    description=description,
+                    thumb=thumb_blob if thumb_blob else None
+                )
+            )
+        except (requests.RequestException, atproto_exceptions.AtProtocolError,
+                ValueError, LookupError) as embed_error:
+            # ValueError covers pydantic validation; LookupError an unknown page charset
+            logger.warning(f"⚠ Could not create embed card: {embed_error}")
+            return None
+    
+    def _send(self, text_builder, embed=None, reply_ref=None) -> str:
+        """
+        Send a prepared post.
+        
+        Args:
+            text_builder: Rich text for the post
+            embed: Optional link card
+            reply_ref: Optional thread reference (parent + root)
+        
+        Returns:
+            URI of the new post
+        """
+        response = _with_retries(self.client.send_post, text_builder, reply_to=reply_ref, embed=embed, idempotent=False)
+        return response.uri
+    
+    def post(self, message: str, reply_to_id: Optional[str] = None, platform_name: Optional[str] = None, stream_data: Optional[dict] = None) -> Optional[str]:
+        if not self.enabled or not self.client:
+            return None
             
-            for match in re.finditer(combined_pattern, message):
-                # Add text before URL/hashtag
-                if match.start() > last_pos:
-                    text_builder.text(message[last_pos:match.start()])
-                
-                matched_text = match.group()
-                
-                # Check if it's a URL or hashtag
-                if matched_text.startswith('http://') or matched_text.startswith('https://'):
-                    # Add URL as clickable link
-                    text_builder.link(matched_text, matched_text)
-                    
-                    # Capture first URL for embed card
-                    if first_url is None:
-                        first_url = matched_text
-                elif matched_text.startswith('#'):
-                    # Add hashtag as clickable tag
-                    # First param: display WITH #, Second param: tag value WITHOUT #
-                    text_builder.tag(matched_text, matched_text[1:])
-                
-                last_pos = match.end()
+        # Bluesky has a strict 300 character limit - final safety check
+        # The AI generator should prevent this, but double-check just in case
+        # Because 300 characters is apparently the exact length needed to express
+        # "I'm streaming Valorant" in a way that respects your audience's time.
+        # Twitter had 280. Bluesky said "fuck that, we need 20 more."
+        message_len = len(message)
+        if message_len > 300:
+            logger.error(f"✗ CRITICAL: Message exceeds Bluesky's 300 char limit ({message_len} chars)")
+            logger.error(f"   This should not happen - check AI generator logic!")
+            logger.error(f"   Message: {message}")
+            # Emergency truncate as last resort
+            message = message[:300]
+            logger.warning(f"   Emergency truncated to 300 chars")
+        
+        try:
+            # Prepare everything the post needs: rich text, the reply parent (looked up in
+            # the background unless we replied to it recently - every update for a stream
+            # threads onto the same post) and the link card for the first URL
+            text_builder, first_url = _build_rich_text(message)
             
-            # Add any remaining text after last URL/hashtag
-            if last_pos < len(message):
-                text_builder.text(message[last_pos:])
+            reply_ref = _REPLY_REF_CACHE.get(reply_to_id) if reply_to_id else None
+            parent_future = None
+            if reply_to_id and reply_ref is None:
+                parent_future = self._io_pool.submit(self.client.app.bsky.feed.get_posts, {'uris': [reply_to_id]})
             
-            # Create embed card for the first URL if found
             embed = None
-            if first_url:
-                try:
-                    # Special handling for Kick with stream_data - use provided metadata
-                    if _is_url_for_domain(first_url, 'kick.com') and stream_data:
-                        logger.info(f"ℹ Using stream metadata for Kick embed (CloudFlare bypass)")
-                        
-                        title = stream_data.get('title', 'Live on Kick')
-                        thumbnail_url = stream_data.get('thumbnail_url')
-                        
-                        # Upload thumbnail to Bluesky if available
-                        thumb_blob = None
-                        if thumbnail_url:
-                            try:
-                                import requests
-                                headers = {
-                                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-                                }
-                                img_response = requests.get(thumbnail_url, headers=headers, timeout=10)
-                                if img_response.status_code == 200:
-                                    upload_response = self.client.upload_blob(img_response.content)
-                                    thumb_blob = upload_response.blob if hasattr(upload_response, 'blob') else None
-                            except Exception as img_error:
-                                logger.warning(f"⚠ Could not upload Kick thumbnail: {img_error}")
-                        
-                        # Create external embed with stream metadata (no viewer count to avoid showing 0 at start)
-                        game_name = stream_data.get('game_name', '')
-                        description = f"🔴 LIVE"
-                        if game_name:
-                            description += f" • {game_name}"
-                        
-                        embed = models.AppBskyEmbedExternal.Main(
-                            external=models.AppBskyEmbedExternal.External(
-                                uri=first_url,
-                                title=title[:300] if title else 'Live on Kick',
-                                description=description[:1000],
-                                thumb=thumb_blob if thumb_blob else None
-                            )
-                        )
-                    elif _is_url_for_domain(first_url, 'kick.com'):
-                        # Kick.com without stream_data - blocks automated requests with CloudFlare security policies
-                        # Links will still be clickable, just without embed cards
-                        logger.info(f"ℹ Kick.com blocks automated requests, posting with clickable link only")
-                        embed = None
-                    elif stream_data and (_is_url_for_domain(first_url, 'twitch.tv') or _is_url_for_domain(first_url, 'youtube.com') or _is_url_for_domain(first_url, 'youtu.be')):
-                        # Use stream_data for Twitch/YouTube if available (more reliable than scraping)
-                        logger.info(f"ℹ Using stream metadata for embed")
-                        
-                        title = stream_data.get('title', 'Live Stream')
-                        thumbnail_url = stream_data.get('thumbnail_url')
-                        
-                        # Upload thumbnail to Bluesky if available
-                        thumb_blob = None
-                        if thumbnail_url:
-                            try:
-                                import requests
-                                headers = {
-                                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-                                }
-                                img_response = requests.get(thumbnail_url, headers=headers, timeout=10)
-                                if img_response.status_code == 200:
-                                    upload_response = self.client.upload_blob(img_response.content)
-                                    thumb_blob = upload_response.blob if hasattr(upload_response, 'blob') else None
-                            except Exception as img_error:
-                                logger.warning(f"⚠ Could not upload thumbnail: {img_error}")
-                        
-                        # Create external embed with stream metadata (no viewer count to avoid showing 0 at start)
-                        game_name = stream_data.get('game_name', '')
-                        description = f"🔴 LIVE"
-                        if game_name:
-                            description += f" • {game_name}"
-                        
-                        embed = models.AppBskyEmbedExternal.Main(
-                            external=models.AppBskyEmbedExternal.External(
-                                uri=first_url,
-                                title=title[:300] if title else 'Live Stream',
-                                description=description[:1000],
-                                thumb=thumb_blob if thumb_blob else None
-                            )
-                        )
-                    else:
-                        # For non-Kick URLs, scrape Open Graph metadata
-                        import requests
-                        from bs4 import BeautifulSoup
-                        from urllib.parse import urlparse
-                        
-                        # Fetch the page with a realistic browser User-Agent
-                        headers = {
-                            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-                            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                            'Accept-Language': 'en-US,en;q=0.5',
-                        }
-                        
-                        response = requests.get(first_url, headers=headers, timeout=10)
-                        response.raise_for_status()  # Raise exception for 4xx/5xx status codes
-                        
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        
-                        # Try Open Graph metadata first
-                        og_title = soup.find('meta', property='og:title')
-                        og_description = soup.find('meta', property='og:description')
-                        og_image = soup.find('meta', property='og:image')
-                        
-                        # Fallback to Twitter Card metadata if OG tags not found
-                        if not og_title:
-                            og_title = soup.find('meta', attrs={'name': 'twitter:title'})
-                        if not og_description:
-                            og_description = soup.find('meta', attrs={'name': 'twitter:description'})
-                        if not og_image:
-                            og_image = soup.find('meta', attrs={'name': 'twitter:image'})
-                        
-                        title = og_title['content'] if og_title and og_title.get('content') else first_url
-                        description = og_description['content'] if og_description and og_description.get('content') else ''
-                        image_url = og_image['content'] if og_image and og_image.get('content') else None
-                        
-                        # Upload image to Bluesky if available
-                        thumb_blob = None
-                        if image_url:
-                            try:
-                                # Handle relative URLs
-                                if image_url.startswith('//'):
-                                    image_url = 'https:' + image_url
-                                elif image_url.startswith('/'):
-                                    parsed = urlparse(first_url)
-                                    image_url = f"{parsed.scheme}://{parsed.netloc}{image_url}"
-                                
-                                img_response = requests.get(image_url, headers=headers, timeout=10)
-                                if img_response.status_code == 200:
-                                    # Upload image as blob and extract the blob reference
-                                    upload_response = self.client.upload_blob(img_response.content)
-                                    # The upload_blob returns a Response object with a blob attribute
-                                    thumb_blob = upload_response.blob if hasattr(upload_response, 'blob') else None
-                            except Exception as img_error:
-                                logger.warning(f"⚠ Could not upload thumbnail: {img_error}")
-                        
-                        # Create external embed with metadata
-                        embed = models.AppBskyEmbedExternal.Main(
-                            external=models.AppBskyEmbedExternal.External(
-                                uri=first_url,
-                                title=title[:300] if title else first_url,  # Limit title length
-                                description=description[:1000] if description else '',  # Limit description length
-                                thumb=thumb_blob if thumb_blob else None
-                            )
-                        )
-                except Exception as embed_error:
-                    logger.warning(f"⚠ Could not create embed card: {embed_error}")
-                    embed = None
+            if first_url and self.embed_cards_enabled:
+                embed = self._build_embed(first_url, stream_data)
             
-            if reply_to_id:
-                # Threading on Bluesky requires parent and root references
-                try:
-                    # Get the parent post details
-                    parent_response = self.client.app.bsky.feed.get_posts({'uris': [reply_to_id]})
-                    
-                    if not parent_response or not hasattr(parent_response, 'posts') or not parent_response.posts:
-                        logger.warning(f"⚠ Could not fetch parent post, posting without thread")
-                        response = self.client.send_post(text_builder, embed=embed)
-                        return response.uri if hasattr(response, 'uri') else None
-                    
-                    parent_post = parent_response.posts[0]
-                    
-                    # Determine root: if parent has a reply, use its root, otherwise parent is root
-                    if hasattr(parent_post.record, 'reply') and parent_post.record.reply:
-                        root_ref = parent_post.record.reply.root
-                    else:
-                        # Parent is the root - create strong ref
-                        root_ref = models.create_strong_ref(parent_post)
-                    
-                    # Create parent reference
-                    parent_ref = models.create_strong_ref(parent_post)
-                    
-                    # Create reply reference
-                    reply_ref = models.AppBskyFeedPost.ReplyRef(
-                        parent=parent_ref,
-                        root=root_ref
-                    )
-                    
-                    # Send threaded post with rich text and embed
-                    response = self.client.send_post(text_builder, reply_to=reply_ref, embed=embed)
-                    return response.uri if hasattr(response, 'uri') else None
-                    
-                except Exception as thread_error:
-                    logger.warning(f"⚠ Bluesky threading failed, posting without thread: {thread_error}")
-                    # Fall back to non-threaded post
-                    response = self.client.send_post(text_builder, embed=embed)
-                    return response.uri if hasattr(response, 'uri') else None
-            else:
+            if not reply_to_id:
                 # Simple post without threading, with rich text and embed card
-                response = self.client.send_post(text_builder, embed=embed)
-                return response.uri if hasattr(response, 'uri') else None
+                return self._send(text_builder, embed)
+            
+            # Threading on Bluesky requires parent and root references
+            try:
+                if reply_ref is None:
+                    reply_ref = _reply_ref_for_parent(parent_future.result())
+                    if reply_ref is None:
+                        logger.warning(f"⚠ Could not fetch parent post, posting without thread")
+                        return self._send(text_builder, embed)
+                    _REPLY_REF_CACHE.set(reply_to_id, reply_ref)
+                
+                # Send threaded post with rich text and embed
+                return self._send(text_builder, embed, reply_ref)
+            except Exception as thread_error:
+                logger.warning(f"⚠ Bluesky threading failed, posting without thread: {thread_error}")
+                # Fall back to non-threaded post
+                return self._send(text_builder, embed)
                 
         except Exception as e:
             logger.error(f"✗ Bluesky post failed: {e}")
             return None
+    
+    def close(self) -> None:
+        """Release this account's worker threads (call on shutdown)."""
+        # _http is shared by every Bluesky account - see close_shared_session()
+        self._io_pool.shutdown(wait=False)
+    
+    @staticmethod
+    def close_shared_session() -> None:
+        """Release the pooled HTTP session shared by all Bluesky accounts (call once at process shutdown)."""
+        _HTTP.close()
@@ -8,38 +8,224 @@ It's like standing in a library and screaming about books. But digital.
 And with more teenage boys calling each other slurs. Progress!
 """
 
+import json
 import logging
 import os
 import re
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
-import requests
+from urllib3.util.retry import Retry
 from stream_daemon.config import get_config, get_bool_config, get_secret
+from stream_daemon.utils import TTLCache, create_session
 
 logger = logging.getLogger(__name__)
 
+# Rate limits and gateway hiccups get a couple of quick retries. POSTs are only retried
+# on connection failures (urllib3 default) - a retried POST that landed is a double ping,
+# while re-sending an edit (PATCH) just writes the same message again.
+_WEBHOOK_RETRY = Retry(
+    total=2,
+    backoff_factor=0.3,
+    status_forcelist=(429, 502, 503),
+    allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {'PATCH'},
+    raise_on_status=False,
+)
 
-def _is_url_for_domain(url: str, domain: str) -> bool:
+
+_URL_RE = re.compile(r'https?://\S+')
+
+
+def _encode_payload(data: dict) -> bytes:
     """
-    Safely check if a URL is for a specific domain.
+    Serialize a webhook payload to compact UTF-8 JSON.
+    
+    requests' json= escapes every emoji into ASCII escape sequences and pads separators with
+    spaces; Discord takes raw UTF-8 just fine, so send fewer bytes.
     
     Args:
-        url: The URL to check
-        domain: The domain to match (e.g., 'kick.com', 'twitch.tv')
+        data: Webhook payload (content/embeds)
     
     Returns:
-        True if the URL's hostname matches or is a subdomain of the domain
+        JSON body as bytes
     """
-    try:
-        parsed = urlparse(url)
-        hostname = parsed.hostname
-        if not hostname:
-            return False
-        # Check exact match or subdomain (e.g., www.kick.com matches kick.com)
-        return hostname == domain or hostname.endswith('.' + domain)
-    except Exception:
-        return False
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _latest_per_platform(updates: List[Tuple[str, dict, str]]) -> Dict[str, int]:
+    """
+    Pick the update that wins for each platform's message.
+    
+    Each platform owns a single tracked message, so of several updates for
+    the same platform only the last matters.
+    
+    Args:
+        updates: (platform_name, stream_data, stream_url) per stream
+    
+    Returns:
+        Lowercase platform name -> index of its last update
+    """
+    latest = {}
+    for index, update in enumerate(updates):
+        latest[(update[0] or '').lower()] = index
+    return latest
+
+
+# Hostname (or parent domain) -> platform key
+_DOMAIN_MAP = {
+    'twitch.tv': 'twitch',
+    'youtube.com': 'youtube',
+    'youtu.be': 'youtube',
+    'kick.com': 'kick',
+}
+
+# platform key -> (live color, live title, ended color, ended title)
+_PLATFORM_META = {
+    'twitch': (0x9146FF, "🟣 Live on Twitch", 0x6441A5, "⏹️ Stream Ended - Twitch"),
+    'youtube': (0xFF0000, "🔴 Live on YouTube", 0xCC0000, "⏹️ Stream Ended - YouTube"),
+    'kick': (0x53FC18, "🟢 Live on Kick", 0x42C814, "⏹️ Stream Ended - Kick"),
+}
+_DEFAULT_META = (0x9146FF, "Live Stream", 0x808080, "Stream Ended")
+
+# An update with identical stream data is only re-sent this often, so the
+# cache-busted thumbnail still refreshes while idle ticks stay off the wire
+_UNCHANGED_REFRESH_SECONDS = 300
+
+# How long end_stream() waits for a queued live update of the same message, so
+# a late "live" edit can't land on top of the "ended" one
+_PENDING_UPDATE_WAIT = 15
+
+# A tracked message that hasn't been updated for a day was orphaned (crash, missed
+# offline check) and is dropped rather than kept forever. The clock restarts on every
+# successful update, so marathon streams stay tracked however long they run.
+_ACTIVE_MESSAGE_TTL = 24 * 3600
+
+
+def _host_of(url: str) -> str:
+    """
+    Pull the lowercase hostname out of an absolute URL without a full urlparse.
+    
+    Matches urlparse(url).hostname for the http(s) URLs we classify: the
+    authority ends at the first '/', '?' or '#', credentials before '@' and
+    any port are dropped. IPv6 literals return '' (never a streaming site).
+    
+    Args:
+        url: URL to inspect
+    
+    Returns:
+        Hostname, or '' if there isn't one
+    """
+    start = url.find('://')
+    if start < 0:
+        return ''
+    netloc = url[start + 3:]
+    for sep in '/?#':
+        netloc = netloc.partition(sep)[0]
+    host = netloc.rpartition('@')[2]
+    if host.startswith('['):
+        return ''
+    return host.partition(':')[0].lower()
+
+
+def _classify(url: Optional[str], platform_key: Optional[str] = None) -> Tuple[Optional[str], int, str, int, str]:
+    """
+    Work out which streaming platform a URL belongs to, and how to dress its embed.
+    
+    The hostname is extracted once and matched exactly or as a subdomain
+    (www.kick.com is kick.com, eviltwitch.tv is not twitch.tv).
+    
+    Args:
+        url: Stream URL
+        platform_key: Lowercase platform name, used when the URL doesn't match
+    
+    Returns:
+        (platform key or None, live color, live title, ended color, ended title)
+    """
+    key = None
+    host = _host_of(url) if url else ''
+    # Strip one leading label at a time: www.kick.com -> kick.com -> com
+    while host:
+        key = _DOMAIN_MAP.get(host)
+        if key:
+            break
+        host = host.partition('.')[2]
+    if key is None and platform_key in _PLATFORM_META:
+        key = platform_key
+    return (key,) + _PLATFORM_META.get(key, _DEFAULT_META)
+
+
+# Embed state -> (viewer field label, footer text). {time} becomes HH:MM:SS.
+_EMBED_STATES = {
+    'live': ("👥 Viewers", "Click to watch the stream!"),
+    'update': ("👥 Viewers", "Last updated: {time} • Click to watch!"),
+    'ended': ("👥 Peak Viewers", "Stream ended at {time} • Click for VOD"),
+}
+
+
+def _embed_base(state: str, url: str, platform_key: Optional[str] = None) -> dict:
+    """
+    Build the parts of an embed that don't change while a stream is live.
+    
+    Args:
+        state: 'live', 'update' or 'ended' (ended streams get muted colors)
+        url: Stream URL the embed links to
+        platform_key: Lowercase platform name, used when the URL doesn't match
+    
+    Returns:
+        Dict with title, url and color
+    """
+    _, color, title, ended_color, ended_title = _classify(url, platform_key)
+    if state == 'ended':
+        color, title = ended_color, ended_title
+    return {"title": title, "url": url, "color": color}
+
+
+def _build_embed(state: str, base: dict, description: Optional[str], stream_data: dict,
+                 now: Optional[float] = None) -> dict:
+    """
+    Assemble a stream embed for one of the post/update/ended states.
+    
+    Args:
+        state: 'live', 'update' or 'ended'
+        base: Title/url/color from _embed_base()
+        description: Embed text, omitted when empty
+        stream_data: Stream info (viewer_count, game_name, thumbnail_url)
+        now: Timestamp for the footer and thumbnail cache-buster (default: now)
+    
+    Returns:
+        Discord embed dict
+    """
+    viewers_label, footer = _EMBED_STATES[state]
+    viewer_count = stream_data.get('viewer_count')
+    game_name = stream_data.get('game_name')
+    thumbnail_url = stream_data.get('thumbnail_url')
+    if now is None:
+        now = time.time()
+    
+    embed = dict(base)
+    if description:
+        embed["description"] = description
+    
+    fields = []
+    if viewer_count is not None:
+        fields.append({"name": viewers_label, "value": f"{viewer_count:,}", "inline": True})
+    if game_name:
+        fields.append({"name": "🎮 Category", "value": game_name, "inline": True})
+    if fields:
+        embed["fields"] = fields
+    
+    if thumbnail_url:
+        if state == 'update':
+            # Cache-busting timestamp forces Discord to fetch the fresh thumbnail
+            separator = '&' if '?' in thumbnail_url else '?'
+            thumbnail_url = f"{thumbnail_url}{separator}_t={int(now)}"
+        embed["image"] = {"url": thumbnail_url}
+    
+    if '{time}' in footer:
+        footer = footer.format(time=time.strftime('%H:%M:%S', time.localtime(now)))
+    embed["footer"] = {"text": footer}
+    return embed
 
 
 class DiscordPlatform:
@@ -52,7 +238,20 @@ class DiscordPlatform:
         self.webhook_urls = {}  # platform_name -> webhook_url mapping
         self.role_id = None  # Default role
         self.role_mentions = {}  # platform_name -> role_id mapping
-        self.active_messages = {}  # platform_name -> {message_id, webhook_url, last_update} tracking
+        # platform_name -> {message_id, webhook_url, last_update, ...} tracking
+        self.active_messages = TTLCache(maxsize=64, ttl=_ACTIVE_MESSAGE_TTL)
+        self._state_file = None  # Optional: where tracked messages survive restarts
+        # Every call goes to discord.com, so keep the connection warm between updates
+        self._session = create_session(
+            headers={'Content-Type': 'application/json'},
+            pool_connections=2,
+            pool_maxsize=4,
+            retries=_WEBHOOK_RETRY,
+        )
+        # Embed edits for several live streams go out side by side instead of one after another
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='discord-webhook')
+        self._pending_updates = {}  # platform_name -> Future of a queued update_stream()
+        self._wait_urls = {}  # webhook_url -> webhook_url with wait=true
         
     def authenticate(self):
         if not get_bool_config('Discord', 'enable_posting', default=False):
@@ -95,6 +294,9 @@ class DiscordPlatform:
                 logger.info(f"  • Discord role configured for {platform.upper()}")
         
         self.enabled = True
+        self._state_file = get_config('Discord', 'state_file')
+        if self._state_file:
+            self._load_state()
         if self.webhook_url:
             logger.info("✓ Discord webhook configured (default)")
         if self.webhook_urls:
@@ -120,63 +322,14 @@ class DiscordPlatform:
             
         try:
             # Extract URL from message for embed
-            url_pattern = r'https?://[^\s]+'
-            url_match = re.search(url_pattern, message)
+            url_match = _URL_RE.search(message)
             first_url = url_match.group() if url_match else None
             
             # Build Discord embed with rich card
             embed = None
             if first_url and stream_data:
-                # Determine color and platform info from URL
-                color = 0x9146FF  # Default purple
-                platform_title = "Live Stream"
-                
-                if _is_url_for_domain(first_url, 'twitch.tv'):
-                    color = 0x9146FF  # Twitch purple
-                    platform_title = "🟣 Live on Twitch"
-                elif _is_url_for_domain(first_url, 'youtube.com') or _is_url_for_domain(first_url, 'youtu.be'):
-                    color = 0xFF0000  # YouTube red
-                    platform_title = "🔴 Live on YouTube"
-                elif _is_url_for_domain(first_url, 'kick.com'):
-                    color = 0x53FC18  # Kick green
-                    platform_title = "🟢 Live on Kick"
-                
-                # Get stream data
                 stream_title = stream_data.get('title', 'Live Stream')
-                viewer_count = stream_data.get('viewer_count')
-                thumbnail_url = stream_data.get('thumbnail_url')
-                game_name = stream_data.get('game_name')
-                
-                embed = {
-                    "title": platform_title,
-                    "description": stream_title if stream_title else "Stream is live!",
-                    "url": first_url,
-                    "color": color,
-                }
-                
-                # Add fields for viewer count and game if available
-                fields = []
-                if viewer_count is not None:
-                    fields.append({
-                        "name": "👥 Viewers",
-                        "value": f"{viewer_count:,}",
-                        "inline": True
-                    })
-                if game_name:
-                    fields.append({
-                        "name": "🎮 Category",
-                        "value": game_name,
-                        "inline": True
-                    })
-                
-                if fields:
-                    embed["fields"] = fields
-                
-                # Add thumbnail if available
-                if thumbnail_url:
-                    embed["image"] = {"url": thumbnail_url}
-                
-                embed["footer"] = {"text": "Click to watch the stream!"}
+                embed = _build_embed('live', _embed_base('live', first_url), stream_title or "Stream is live!", stream_data)
             
             # Build content: LLM message + role mention
             content = message  # Start with the LLM-generated message
@@ -196,22 +349,30 @@ class DiscordPlatform:
             if embed:
                 data["embeds"] = [embed]
             
-            # Add ?wait=true to get the message ID back
-            webhook_url_with_wait = webhook_url + "?wait=true" if "?" not in webhook_url else webhook_url + "&wait=true"
+            # Add ?wait=true to get the message ID back (built once per webhook)
+            webhook_url_with_wait = self._wait_urls.get(webhook_url)
+            if webhook_url_with_wait is None:
+                webhook_url_with_wait = webhook_url + ('&' if '?' in webhook_url else '?') + 'wait=true'
+                self._wait_urls[webhook_url] = webhook_url_with_wait
             
-            response = requests.post(webhook_url_with_wait, json=data, timeout=10)
+            response = self._session.post(webhook_url_with_wait, data=_encode_payload(data), timeout=10)
             
             if response.status_code == 200:
                 # Store message info for future updates
                 message_data = response.json()
                 message_id = message_data.get('id')
                 if message_id and platform_name:
-                    self.active_messages[platform_name.lower()] = {
+                    now = time.time()
+                    self.active_messages.set(platform_name.lower(), {
                         'message_id': message_id,
                         'webhook_url': webhook_url,
-                        'last_update': time.time(),
-                        'original_content': content  # Store LLM message + role mention
-                    }
+                        'edit_url': f"{webhook_url}/messages/{message_id}",
+                        'posted_at': now,
+                        'last_update': now,
+                        # Title/url/color never change while live - updates start from this
+                        'embed_base': {k: embed[k] for k in ('title', 'url', 'color')} if embed else None,
+                    })
+                    self._save_state()
                 logger.info(f"✓ Discord embed posted (ID: {message_id})")
                 return message_id
             else:
@@ -227,84 +388,48 @@ class DiscordPlatform:
             return False
         
         platform_key = platform_name.lower()
-        if platform_key not in self.active_messages:
+        msg_info = self.active_messages.get(platform_key)
+        if msg_info is None:
             logger.debug(f"No active Discord message for {platform_name} to update")
             return False
         
-        msg_info = self.active_messages[platform_key]
-        message_id = msg_info['message_id']
-        webhook_url = msg_info['webhook_url']
+        
+        # One clock read per update: skip check, thumbnail cache-buster, footer, last_update
+        now = time.time()
+        
+        # Nothing changed since the last edit - skip the PATCH unless the thumbnail is due
+        stream_title = stream_data.get('title', 'Live Stream')
+        viewer_count = stream_data.get('viewer_count')
+        thumbnail_url = stream_data.get('thumbnail_url')
+        game_name = stream_data.get('game_name')
+        signature = (stream_url, stream_title, viewer_count, thumbnail_url, game_name)
+        if (msg_info.get('last_signature') == signature
+                and now - msg_info['last_update'] < _UNCHANGED_REFRESH_SECONDS):
+            logger.debug(f"Discord embed for {platform_name} unchanged, skipping update")
+            return True
         
         try:
-            # Determine color and platform info
-            color = 0x9146FF  # Default purple
-            platform_title = "Live Stream"
-            
-            if _is_url_for_domain(stream_url, 'twitch.tv') or platform_key == 'twitch':
-                color = 0x9146FF
-                platform_title = "🟣 Live on Twitch"
-            elif _is_url_for_domain(stream_url, 'youtube.com') or _is_url_for_domain(stream_url, 'youtu.be') or platform_key == 'youtube':
-                color = 0xFF0000
-                platform_title = "🔴 Live on YouTube"
-            elif _is_url_for_domain(stream_url, 'kick.com') or platform_key == 'kick':
-                color = 0x53FC18
-                platform_title = "🟢 Live on Kick"
-            
-            # Build updated embed
-            stream_title = stream_data.get('title', 'Live Stream')
-            viewer_count = stream_data.get('viewer_count')
-            thumbnail_url = stream_data.get('thumbnail_url')
-            game_name = stream_data.get('game_name')
-            
-            embed = {
-                "title": platform_title,
-                "description": stream_title,
-                "url": stream_url,
-                "color": color,
-            }
-            
-            # Add fields for viewer count and game
-            fields = []
-            if viewer_count is not None:
-                fields.append({
-                    "name": "👥 Viewers",
-                    "value": f"{viewer_count:,}",
-                    "inline": True
-                })
-            if game_name:
-                fields.append({
-                    "name": "🎮 Category",
-                    "value": game_name,
-                    "inline": True
-                })
-            
-            if fields:
-                embed["fields"] = fields
-            
-            # Add thumbnail with cache-busting timestamp to force refresh
-            if thumbnail_url:
-                # Add timestamp to URL to force Discord to fetch new thumbnail
-                separator = '&' if '?' in thumbnail_url else '?'
-                embed["image"] = {"url": f"{thumbnail_url}{separator}_t={int(time.time())}"}
-            
-            # Add last updated timestamp in footer
-            embed["footer"] = {"text": f"Last updated: {time.strftime('%H:%M:%S')} • Click to watch!"}
+            # Start from the static part of the posted embed; only rebuild it if the URL moved
+            embed_base = msg_info.get('embed_base')
+            if not embed_base or embed_base['url'] != stream_url:
+                embed_base = _embed_base('update', stream_url, platform_key)
+                msg_info['embed_base'] = embed_base
+            embed = _build_embed('update', embed_base, stream_title, stream_data, now)
             
-            # Keep original content (LLM message + role mention) from initial post
-            content = msg_info.get('original_content', '')
-            
-            # Build update payload
-            data = {}
-            if content:
-                data["content"] = content
-            data["embeds"] = [embed]
+            # Only the embed changes - fields left out of a webhook edit stay as
+            # posted, so the LLM message + role mention don't need re-sending
+            data = {"embeds": [embed]}
             
             # PATCH the message via webhook
-            edit_url = f"{webhook_url}/messages/{message_id}"
-            response = requests.patch(edit_url, json=data, timeout=10)
+            response = self._session.patch(msg_info['edit_url'], data=_encode_payload(data), timeout=10)
             
             if response.status_code == 200:
-                msg_info['last_update'] = time.time()
+                msg_info['last_update'] = now
+                msg_info['last_signature'] = signature
+                # Write it back so the TTL slides - unless the stream ended meanwhile
+                if self.active_messages.get(platform_key) is msg_info:
+                    self.active_messages.set(platform_key, msg_info)
+                    self._save_state()
                 logger.info(f"✓ Discord embed updated for {platform_name} (viewers: {viewer_count:,})" if viewer_count else f"✓ Discord embed updated for {platform_name}")
                 return True
             else:
@@ -315,11 +440,111 @@ class DiscordPlatform:
             logger.error(f"✗ Discord update failed: {e}")
             return False
     
+    def queue_updates(self, updates: List[Tuple[str, dict, str]]) -> int:
+        """
+        Send live embed updates in the background without waiting for Discord.
+        
+        A slow or rate-limited webhook no longer holds up the daemon's check loop,
+        and with Twitch, YouTube and Kick all live the edits go out concurrently;
+        update_stream() logs its own outcome. Each platform owns a single tracked
+        message, so only the last update per platform is sent, and a platform whose
+        previous update is still in flight is skipped this tick rather than queued twice.
+        
+        Args:
+            updates: (platform_name, stream_data, stream_url) per stream
+        
+        Returns:
+            Number of updates queued
+        """
+        queued = 0
+        for platform_key, index in _latest_per_platform(updates).items():
+            pending = self._pending_updates.get(platform_key)
+            if pending is not None and not pending.done():
+                logger.debug(f"Discord update for {platform_key} still in flight, skipping this tick")
+                continue
+            self._pending_updates[platform_key] = self._executor.submit(self.update_stream, *updates[index])
+            queued += 1
+        return queued
+    
+    def _wait_for_pending_update(self, platform_key: str) -> None:
+        """Let a queued live update for this message finish before it's edited again."""
+        pending = self._pending_updates.pop(platform_key, None)
+        if pending is None:
+            return
+        try:
+            pending.result(timeout=_PENDING_UPDATE_WAIT)
+        except FutureTimeoutError:
+            logger.warning(f"⚠ Discord update for {platform_key} still pending after {_PENDING_UPDATE_WAIT}s")
+    
+    def _load_state(self) -> None:
+        """
+        Pick up messages tracked by a previous run, so a restart mid-stream keeps
+        editing the existing embed instead of leaving it stuck on "live".
+        
+        Webhook URLs are never written to disk; they're looked up again from the
+        current configuration.
+        """
+        saved = TTLCache(maxsize=64, ttl=_ACTIVE_MESSAGE_TTL)
+        try:
+            saved.load(self._state_file)
+        except FileNotFoundError:
+            # First run - nothing saved yet
+            return
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"⚠ Ignoring unreadable Discord state file {self._state_file}: {e}")
+            return
+        
+        restored = 0
+        cutoff = time.time() - _ACTIVE_MESSAGE_TTL
+        for platform_key, entry in saved.items():
+            try:
+                message_id, posted_at = entry['message_id'], entry['posted_at']
+                active_at = entry.get('active_at', posted_at)
+                embed_base = entry.get('embed_base')
+            except (KeyError, TypeError, AttributeError):
+                continue
+            webhook_url = self.webhook_urls.get(platform_key, self.webhook_url)
+            if not webhook_url or active_at < cutoff:
+                continue
+            self.active_messages.set(platform_key, {
+                'message_id': message_id,
+                'webhook_url': webhook_url,
+                'edit_url': f"{webhook_url}/messages/{message_id}",
+                'posted_at': posted_at,
+                'last_update': 0,  # Refresh on the first tick
+                'embed_base': embed_base,
+            })
+            restored += 1
+        if restored:
+            logger.info(f"ℹ Restored {restored} tracked Discord message(s) from {self._state_file}")
+    
+    def _save_state(self) -> None:
+        """Write tracked message IDs to the state file, if one is configured."""
+        if not self._state_file:
+            return
+        snapshot = TTLCache(maxsize=64, ttl=_ACTIVE_MESSAGE_TTL)
+        for platform_key, msg_info in self.active_messages.items():
+            snapshot.set(platform_key, {
+                'message_id': msg_info['message_id'],
+                'posted_at': msg_info['posted_at'],
+                'active_at': max(msg_info['posted_at'], msg_info['last_update']),
+                'embed_base': msg_info.get('embed_base'),
+            })
+        try:
+            snapshot.save(self._state_file)
+        except (OSError, TypeError) as e:
+            logger.warning(f"⚠ Could not save Discord state to {self._state_file}: {e}")
+    
+    def close(self) -> None:
+        """Release pooled connections and worker threads (call on shutdown)."""
+        self._executor.shutdown(wait=False)
+        self._session.close()
+    
     def clear_stream(self, platform_name: str) -> None:
         """Clear tracked message for a platform when stream ends."""
         platform_key = platform_name.lower()
-        if platform_key in self.active_messages:
-            del self.active_messages[platform_key]
+        if self.active_messages.pop(platform_key) is not None:
+            self._save_state()
             logger.debug(f"Cleared Discord message tracking for {platform_name}")
     
     def end_stream(self, platform_name: str, stream_data: dict, stream_url: str) -> bool:
@@ -328,13 +553,12 @@ class DiscordPlatform:
             return False
         
         platform_key = platform_name.lower()
-        if platform_key not in self.active_messages:
+        self._wait_for_pending_update(platform_key)
+        msg_info = self.active_messages.get(platform_key)
+        if msg_info is None:
             logger.debug(f"No active Discord message for {platform_name} to mark as ended")
             return False
         
-        msg_info = self.active_messages[platform_key]
-        message_id = msg_info['message_id']
-        webhook_url = msg_info['webhook_url']
         
         try:
             # Get custom "stream ended" message from .env (configuration, NOT secrets)
@@ -349,57 +573,10 @@ class DiscordPlatform:
                 # Ultimate fallback if no config provided
                 ended_message = "Thanks for joining! Tune in next time 💜"
             
-            # Determine color and platform info (use muted colors for ended streams)
-            color = 0x808080  # Gray for ended
-            platform_title = "Stream Ended"
-            
-            if _is_url_for_domain(stream_url, 'twitch.tv') or platform_key == 'twitch':
-                color = 0x6441A5  # Muted purple
-                platform_title = "⏹️ Stream Ended - Twitch"
-            elif _is_url_for_domain(stream_url, 'youtube.com') or _is_url_for_domain(stream_url, 'youtu.be') or platform_key == 'youtube':
-                color = 0xCC0000  # Muted red
-                platform_title = "⏹️ Stream Ended - YouTube"
-            elif _is_url_for_domain(stream_url, 'kick.com') or platform_key == 'kick':
-                color = 0x42C814  # Muted green
-                platform_title = "⏹️ Stream Ended - Kick"
-            
-            # Build updated embed with ended message
+            # Muted colors for ended streams; keep the VOD link and final stats
             stream_title = stream_data.get('title', 'Stream')
-            viewer_count = stream_data.get('viewer_count')
-            thumbnail_url = stream_data.get('thumbnail_url')
-            game_name = stream_data.get('game_name')
-            
-            embed = {
-                "title": platform_title,
-                "description": f"{ended_message}\n\n**{stream_title}**",
-                "url": stream_url,  # Keep VOD link
-                "color": color,
-            }
-            
-            # Add fields for peak viewer count and game
-            fields = []
-            if viewer_count is not None:
-                fields.append({
-                    "name": "👥 Peak Viewers",
-                    "value": f"{viewer_count:,}",
-                    "inline": True
-                })
-            if game_name:
-                fields.append({
-                    "name": "🎮 Category",
-                    "value": game_name,
-                    "inline": True
-                })
-            
-            if fields:
-                embed["fields"] = fields
-            
-            # Keep final thumbnail
-            if thumbnail_url:
-                embed["image"] = {"url": thumbnail_url}
-            
-            # Add ended timestamp in footer
-            embed["footer"] = {"text": f"Stream ended at {time.strftime('%H:%M:%S')} • Click for VOD"}
+            embed = _build_embed('ended', _embed_base('ended', stream_url, platform_key),
+                                 f"{ended_message}\n\n**{stream_title}**", stream_data)
             
             # Keep role mention visible but don't ping again
             content = ""
@@ -416,12 +593,12 @@ class DiscordPlatform:
             data["embeds"] = [embed]
             
             # PATCH the message via webhook
-            edit_url = f"{webhook_url}/messages/{message_id}"
-            response = requests.patch(edit_url, json=data, timeout=10)
+            response = self._session.patch(msg_info['edit_url'], data=_encode_payload(data), timeout=10)
             
             if response.status_code == 200:
                 # Clear tracking after successful update
-                del self.active_messages[platform_key]
+                self.active_messages.pop(platform_key)
+                self._save_state()
                 logger.info(f"✓ Discord embed updated to show {platform_name} stream ended")
                 return True
             else:
@@ -7,37 +7,63 @@ and somewhere in that game of telephone, someone finds out you're playing Minecr
 """
 
 import logging
-from typing import Optional
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from io import BytesIO
+from typing import Optional, Tuple
+from urllib.parse import urlparse
 from mastodon import Mastodon
 from stream_daemon.config import get_config, get_bool_config, get_secret
+from stream_daemon.platforms.base import SocialPlatform
+from stream_daemon.utils import TTLCache, create_session
 
 logger = logging.getLogger(__name__)
 
+# Stream CDNs regenerate preview images every few minutes, so a downloaded
+# thumbnail is good for a reply chain but not for the next stream. After that
+# it's revalidated with ETag/Last-Modified rather than blindly re-downloaded.
+_THUMB_CACHE_TTL = 300
+_THUMB_REVALIDATE_TTL = 3600
+_THUMB_CHUNK_BYTES = 64 * 1024
+# Preview images are a few hundred KB; anything past this is not a thumbnail (and
+# Mastodon instances commonly reject images this size anyway)
+_THUMB_MAX_BYTES = 8 * 1024 * 1024
 
-class SocialPlatform:
-    """Base class for social platforms."""
+_THUMB_UPLOAD_TIMEOUT = 15  # seconds
+
+# media_post needs an explicit MIME type when handed bytes instead of a file path
+_EXT_TO_MIME = {'.jpg': 'image/jpeg', '.png': 'image/png', '.webp': 'image/webp'}
+
+# Upload extension from the response Content-Type, falling back to the URL suffix
+_CT_TO_EXT = {'image/jpeg': '.jpg', 'image/jpg': '.jpg', 'image/png': '.png', 'image/webp': '.webp'}
+_SUF_TO_EXT = {'.jpg': '.jpg', '.jpeg': '.jpg', '.png': '.png', '.webp': '.webp'}
+
+
+def _thumbnail_ext(content_type: str, url: str) -> str:
+    """
+    Pick the upload extension for a thumbnail.
     
-    def __init__(self, name):
-        self.name = name
-        self.enabled = False
+    Args:
+        content_type: Content-Type header of the image response
+        url: Thumbnail URL (query strings are ignored)
     
-    def post(self, message: str, reply_to_id: Optional[str] = None, platform_name: Optional[str] = None) -> Optional[str]:
-        """
-        Post message to platform.
-        
-        Args:
-            message: The message to post
-            reply_to_id: Optional post ID to reply to (for threading)
-            platform_name: Optional streaming platform name (for role mentions in Discord/Matrix)
-            
-        Returns:
-            Post ID if successful, None otherwise
-        """
-        raise NotImplementedError
-    
-    def authenticate(self):
-        """Authenticate with the platform."""
-        raise NotImplementedError
+    Returns:
+        One of the _EXT_TO_MIME keys - '.jpg' when nothing matches
+    """
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    suffix = os.path.splitext(urlparse(url).path)[1].lower()
+    return _CT_TO_EXT.get(media_type) or _SUF_TO_EXT.get(suffix, '.jpg')
+
+
+# Thumbnails come from the same few stream CDNs every time - keep those connections warm
+_THUMB_SESSION = create_session(
+    headers={
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    },
+    pool_connections=4,
+    pool_maxsize=8,
+)
 
 
 class MastodonPlatform(SocialPlatform):
@@ -46,6 +72,11 @@ class MastodonPlatform(SocialPlatform):
     def __init__(self):
         super().__init__("Mastodon")
         self.client = None
+        # thumbnail URL -> (image bytes, content type, ETag, Last-Modified, fetched at).
+        # Bytes, not media IDs: Mastodon refuses media already attached to another status.
+        self._thumb_cache = TTLCache(maxsize=16, ttl=_THUMB_REVALIDATE_TTL)
+        # Thumbnail download + upload runs here so a hung CDN can't hold the post hostage
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='mastodon-io')
         
     def authenticate(self):
         if not get_bool_config('Mastodon', 'enable_posting', default=False):
@@ -65,7 +96,7 @@ class MastodonPlatform(SocialPlatform):
                                   doppler_secret_env='SECRETS_DOPPLER_MASTODON_SECRET_NAME')
         api_base_url = get_config('Mastodon', 'api_base_url')
         
-        if not all([client_id, client_secret, access_token, api_base_url]):
+        if not (client_id and client_secret and access_token and api_base_url):
             return False
             
         try:
@@ -82,71 +113,161 @@ class MastodonPlatform(SocialPlatform):
             logger.warning(f"✗ Mastodon authentication failed: {e}")
             return False
     
+    def _download_thumbnail(self, thumbnail_url: str) -> Optional[Tuple[bytes, str]]:
+        """
+        Fetch a stream thumbnail, reusing a recent download of the same URL.
+        
+        Args:
+            thumbnail_url: Image URL from the stream data
+        
+        Returns:
+            (image bytes, content type), or None if the download failed
+        """
+        cached = self._thumb_cache.get(thumbnail_url)
+        if cached and time.monotonic() - cached[4] < _THUMB_CACHE_TTL:
+            logger.debug("Reusing cached Mastodon thumbnail")
+            return cached[0], cached[1]
+        
+        headers = {}
+        # Older copy on hand - ask the CDN whether it changed before downloading it again
+        if cached:
+            if cached[2]:
+                headers['If-None-Match'] = cached[2]
+            if cached[3]:
+                headers['If-Modified-Since'] = cached[3]
+        
+        with _THUMB_SESSION.get(thumbnail_url, headers=headers, timeout=10, stream=True) as img_response:
+            if img_response.status_code == 304 and cached:
+                logger.debug("Mastodon thumbnail unchanged (304), reusing cached copy")
+                image_bytes, content_type = cached[0], cached[1]
+            elif img_response.status_code == 200:
+                image_bytes = self._read_capped(img_response)
+                if image_bytes is None:
+                    return None
+                content_type = img_response.headers.get('content-type', '')
+            else:
+                return None
+        
+        self._thumb_cache.set(thumbnail_url, (
+            image_bytes,
+            content_type,
+            img_response.headers.get('ETag') or (cached[2] if cached else None),
+            img_response.headers.get('Last-Modified') or (cached[3] if cached else None),
+            time.monotonic(),
+        ))
+        return image_bytes, content_type
+    
+    @staticmethod
+    def _read_capped(img_response) -> Optional[bytes]:
+        """
+        Read a streamed image body, giving up once it passes _THUMB_MAX_BYTES.
+        
+        Args:
+            img_response: Streamed (stream=True) thumbnail response
+        
+        Returns:
+            Image bytes, or None if the image is too large
+        """
+        try:
+            declared = int(img_response.headers.get('Content-Length') or 0)
+        except ValueError:
+            declared = 0
+        if declared > _THUMB_MAX_BYTES:
+            logger.warning(f"⚠ Skipping Mastodon thumbnail: {declared:,} bytes is over the {_THUMB_MAX_BYTES:,} byte limit")
+            return None
+        
+        # Content-Length can lie (or be missing) - count what actually arrives
+        chunks = []
+        total = 0
+        for chunk in img_response.iter_content(_THUMB_CHUNK_BYTES):
+            total += len(chunk)
+            if total > _THUMB_MAX_BYTES:
+                logger.warning(f"⚠ Skipping Mastodon thumbnail: more than {_THUMB_MAX_BYTES:,} bytes")
+                return None
+            chunks.append(chunk)
+        return b''.join(chunks)
+    
+    def _upload_thumbnail(self, thumbnail_url: str, stream_data: dict) -> Optional[str]:
+        """
+        Download a stream thumbnail and upload it as a media attachment.
+        
+        Args:
+            thumbnail_url: Image URL from the stream data
+            stream_data: Stream info, used for the image description
+        
+        Returns:
+            Mastodon media ID, or None if the thumbnail couldn't be attached
+        """
+        try:
+            thumbnail = self._download_thumbnail(thumbnail_url)
+            if not thumbnail:
+                return None
+            
+            image_bytes, content_type = thumbnail
+            ext = _thumbnail_ext(content_type, thumbnail_url)
+            
+            # Build description with stream info
+            viewer_count = stream_data.get('viewer_count', 0)
+            game_name = stream_data.get('game_name', '')
+            description = f"🔴 LIVE"
+            if viewer_count:
+                description += f" • {viewer_count:,} viewers"
+            if game_name:
+                description += f" • {game_name}"
+            
+            # Straight from memory - no temp file to write, re-read and clean up
+            media = self.client.media_post(
+                BytesIO(image_bytes),
+                mime_type=_EXT_TO_MIME[ext],
+                description=description,
+                file_name=f"thumbnail{ext}",
+            )
+            logger.info(f"✓ Uploaded thumbnail to Mastodon (media ID: {media['id']})")
+            return media['id']
+        except Exception as img_error:
+            logger.warning(f"⚠ Could not upload thumbnail to Mastodon: {img_error}")
+            return None
+    
+    def _thumbnail_result(self, thumb_future) -> Optional[str]:
+        """
+        Collect a thumbnail upload started on the I/O pool.
+        
+        Args:
+            thumb_future: Future from submitting _upload_thumbnail, or None
+        
+        Returns:
+            Media ID, or None if there was no upload or it took too long
+        """
+        if thumb_future is None:
+            return None
+        try:
+            return thumb_future.result(timeout=_THUMB_UPLOAD_TIMEOUT)
+        except FutureTimeoutError:
+            logger.warning(f"⚠ Thumbnail upload took over {_THUMB_UPLOAD_TIMEOUT}s, posting to Mastodon without it")
+            return None
+    
     def post(self, message: str, reply_to_id: Optional[str] = None, platform_name: Optional[str] = None, stream_data: Optional[dict] = None) -> Optional[str]:
         if not self.enabled or not self.client:
             return None
             
         try:
-            # Check if we should attach a thumbnail image
-            media_ids = []
-            if stream_data:
-                thumbnail_url = stream_data.get('thumbnail_url')
-                if thumbnail_url:
-                    try:
-                        import requests
-                        import tempfile
-                        import os
-                        
-                        # Download thumbnail
-                        headers = {
-                            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-                        }
-                        img_response = requests.get(thumbnail_url, headers=headers, timeout=10)
-                        
-                        if img_response.status_code == 200:
-                            # Determine file extension from content type or URL
-                            content_type = img_response.headers.get('content-type', '')
-                            if 'jpeg' in content_type or 'jpg' in content_type or thumbnail_url.endswith('.jpg'):
-                                ext = '.jpg'
-                            elif 'png' in content_type or thumbnail_url.endswith('.png'):
-                                ext = '.png'
-                            elif 'webp' in content_type or thumbnail_url.endswith('.webp'):
-                                ext = '.webp'
-                            else:
-                                ext = '.jpg'  # Default fallback
-                            
-                            # Save to temporary file
-                            with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp_file:
-                                tmp_file.write(img_response.content)
-                                tmp_path = tmp_file.name
-                            
-                            try:
-                                # Upload to Mastodon
-                                # Build description with stream info
-                                viewer_count = stream_data.get('viewer_count', 0)
-                                game_name = stream_data.get('game_name', '')
-                                description = f"🔴 LIVE"
-                                if viewer_count:
-                                    description += f" • {viewer_count:,} viewers"
-                                if game_name:
-                                    description += f" • {game_name}"
-                                
-                                media = self.client.media_post(tmp_path, description=description)
-                                media_ids.append(media['id'])
-                                logger.info(f"✓ Uploaded thumbnail to Mastodon (media ID: {media['id']})")
-                            finally:
-                                # Clean up temp file
-                                os.unlink(tmp_path)
-                    except Exception as img_error:
-                        logger.warning(f"⚠ Could not upload thumbnail to Mastodon: {img_error}")
+            # Attach a thumbnail if there is one - but a slow CDN or media upload
+            # only gets so long before the announcement goes out without it
+            thumbnail_url = stream_data.get('thumbnail_url') if stream_data else None
+            thumb_future = self._io_pool.submit(self._upload_thumbnail, thumbnail_url, stream_data) if thumbnail_url else None
+            media_id = self._thumbnail_result(thumb_future)
             
             # Post as a reply if reply_to_id is provided (threading)
             status = self.client.status_post(
                 message, 
                 in_reply_to_id=reply_to_id,
-                media_ids=media_ids if media_ids else None
+                media_ids=[media_id] if media_id else None
             )
             return str(status['id'])
         except Exception as e:
             logger.error(f"✗ Mastodon post failed: {e}")
             return None
+    
+    def close(self) -> None:
+        """Stop the thumbnail worker threads (call on shutdown)."""
+        self._io_pool.shutdown(wait=False)
@@ -14,15 +14,56 @@ and 0% more actual functionality than IRC had in 1988. But hey, at least we can
 Fucking emojis. That's what we needed to solve. Not world hunger, not climate change - emojis.
 """
 
+import json
 import logging
 import re
+import uuid
 from typing import Optional
 from urllib.parse import quote, urlparse
-import requests
-from stream_daemon.config import get_bool_config, get_secret
+from urllib3.util.retry import Retry
+from stream_daemon.config import get_config, get_bool_config, get_secret
+from stream_daemon.platforms.base import SocialPlatform
+from stream_daemon.utils import TTLCache, create_session
 
 logger = logging.getLogger(__name__)
 
+# Rate limits and gateway errors get retried on the pooled connection (honouring
+# Retry-After). Messages are sent as PUTs with a transaction ID, so a retried send is
+# deduplicated by the homeserver; the login POST is never re-sent once it got through.
+_HOMESERVER_RETRY = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 502, 503, 504), raise_on_status=False)
+
+_URL_RE = re.compile(r'https?://\S+')
+
+
+def _encode_event(data: dict) -> bytes:
+    """
+    Serialize a Matrix request body to compact UTF-8 JSON.
+    
+    Same trick as Discord: requests' json= escapes every emoji and pads separators,
+    but the homeserver reads raw UTF-8 fine.
+    
+    Args:
+        data: Login or message event body
+    
+    Returns:
+        JSON body as bytes
+    """
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# Login tokens without an expiry are still re-checked monthly; ones that do expire
+# are dropped a little early so we never send a token that dies in flight
+_TOKEN_MAX_TTL = 30 * 24 * 3600
+_TOKEN_EXPIRY_SKEW = 30
+
+# (domain, HTML header) - a URL matches the domain itself or any subdomain of it
+_PLATFORM_PREFIXES = (
+    ('twitch.tv', '<p><strong>🟣 Live on Twitch!</strong></p>'),
+    ('youtube.com', '<p><strong>🔴 Live on YouTube!</strong></p>'),
+    ('youtu.be', '<p><strong>🔴 Live on YouTube!</strong></p>'),
+    ('kick.com', '<p><strong>🟢 Live on Kick!</strong></p>'),
+)
+
 
 def _is_url_for_domain(url: str, domain: str) -> bool:
     """
@@ -61,7 +102,7 @@ def _is_url_for_domain(url: str, domain: str) -> bool:
         return False
 
 
-class MatrixPlatform:
+class MatrixPlatform(SocialPlatform):
     """
     Matrix platform with rich message support.
     
@@ -70,13 +111,22 @@ class MatrixPlatform:
     """
     
     def __init__(self):
-        self.name = "Matrix"
-        self.enabled = False
+        super().__init__("Matrix")
         self.homeserver = None
         self.access_token = None
         self.room_id = None
         self.username = None
         self.password = None
+        # Optional: reuse password-login tokens across restarts instead of logging in again
+        self._token_cache_file = None
+        self._token_cache = TTLCache(maxsize=8, ttl=_TOKEN_MAX_TTL)
+        # Everything goes to one homeserver - keep the TLS connection warm between posts
+        self._session = create_session(
+            headers={'Content-Type': 'application/json'},
+            pool_connections=2,
+            pool_maxsize=4,
+            retries=_HOMESERVER_RETRY,
+        )
         
     def authenticate(self):
         if not get_bool_config('Matrix', 'enable_posting', default=False):
@@ -117,6 +167,9 @@ class MatrixPlatform:
         if self.username and self.password:
             # Login to get fresh access token
             logger.info("Using username/password authentication (auto-rotation enabled)")
+            self._token_cache_file = get_config('Matrix', 'token_cache_file')
+            if self._token_cache_file:
+                self._load_token_cache()
             self.access_token = self._login_and_get_token()
             if not self.access_token:
                 logger.error("✗ Matrix login failed - check username/password")
@@ -138,8 +191,55 @@ class MatrixPlatform:
         logger.info(f"✓ Matrix authenticated ({self.room_id})")
         return True
     
-    def _login_and_get_token(self):
-        """Login with username/password to get access token."""
+    def _token_cache_key(self) -> str:
+        return f"{self.homeserver}|{self.username}"
+    
+    def _load_token_cache(self) -> None:
+        """Pick up login tokens saved by a previous run."""
+        try:
+            loaded = self._token_cache.load(self._token_cache_file)
+            logger.debug(f"Loaded {loaded} cached Matrix token(s)")
+        except FileNotFoundError:
+            # First run - nothing saved yet
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"⚠ Ignoring unreadable Matrix token cache {self._token_cache_file}: {e}")
+    
+    def _remember_token(self, access_token: str, expires_in_ms: Optional[int]) -> None:
+        """
+        Keep a fresh login token, and write it to the token cache file if configured.
+        
+        Args:
+            access_token: Token from the login response
+            expires_in_ms: Token lifetime from the login response (None = no expiry)
+        """
+        ttl = _TOKEN_MAX_TTL
+        if expires_in_ms:
+            ttl = min(ttl, expires_in_ms / 1000 - _TOKEN_EXPIRY_SKEW)
+        if ttl <= 0:
+            return
+        self._token_cache.set(self._token_cache_key(), access_token, ttl=ttl)
+        if self._token_cache_file:
+            try:
+                self._token_cache.save(self._token_cache_file)
+            except (OSError, TypeError) as e:
+                logger.warning(f"⚠ Could not save Matrix token cache to {self._token_cache_file}: {e}")
+    
+    def _login_and_get_token(self, use_cache: bool = True):
+        """
+        Login with username/password to get access token.
+        
+        Args:
+            use_cache: Reuse an unexpired token from an earlier login if there is one
+        """
+        if use_cache:
+            cached_token = self._token_cache.get(self._token_cache_key())
+            if cached_token:
+                logger.info("✓ Reusing cached Matrix access token")
+                return cached_token
+        else:
+            self._token_cache.pop(self._token_cache_key())
+        
         try:
             # Extract just the username part from full MXID (@username:domain)
             # Matrix login expects just "username", not "@username:domain"
@@ -158,13 +258,14 @@ class MatrixPlatform:
                 "password": self.password
             }
             
-            response = requests.post(login_url, json=login_data, timeout=10)
+            response = self._session.post(login_url, data=_encode_event(login_data), timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
                 access_token = data.get('access_token')
                 if access_token:
                     logger.info(f"✓ Obtained Matrix access token (expires: {data.get('expires_in_ms', 'never')})")
+                    self._remember_token(access_token, data.get('expires_in_ms'))
                     return access_token
                 else:
                     logger.error(f"✗ Matrix login succeeded but no access_token in response")
@@ -180,14 +281,13 @@ class MatrixPlatform:
         if not self.enabled:
             logger.debug(f"⚠ Matrix post skipped: disabled (enabled={self.enabled})")
             return None
-        if not all([self.homeserver, self.access_token, self.room_id]):
+        if not (self.homeserver and self.access_token and self.room_id):
             logger.warning(f"⚠ Matrix post skipped: missing credentials (homeserver={bool(self.homeserver)}, token={bool(self.access_token)}, room={bool(self.room_id)})")
             return None
             
         try:
             # Extract URL from message for rich formatting
-            url_pattern = r'https?://[^\s]+'
-            url_match = re.search(url_pattern, message)
+            url_match = _URL_RE.search(message)
             first_url = url_match.group() if url_match else None
             
             # Create rich HTML message with link preview
@@ -196,15 +296,18 @@ class MatrixPlatform:
             
             if first_url:
                 # Make URL clickable in HTML
-                html_body = re.sub(url_pattern, f'<a href="{first_url}">{first_url}</a>', message)
+                html_body = _URL_RE.sub(f'<a href="{first_url}">{first_url}</a>', message)
                 
-                # Add platform-specific styling
-                if _is_url_for_domain(first_url, 'twitch.tv'):
-                    html_body = f'<p><strong>🟣 Live on Twitch!</strong></p><p>{html_body}</p>'
-                elif _is_url_for_domain(first_url, 'youtube.com') or _is_url_for_domain(first_url, 'youtu.be'):
-                    html_body = f'<p><strong>🔴 Live on YouTube!</strong></p><p>{html_body}</p>'
-                elif _is_url_for_domain(first_url, 'kick.com'):
-                    html_body = f'<p><strong>🟢 Live on Kick!</strong></p><p>{html_body}</p>'
+                # Add platform-specific styling (hostname parsed once for all domains)
+                try:
+                    hostname = (urlparse(first_url).hostname or '').lower()
+                except ValueError:
+                    hostname = ''
+                if hostname:
+                    for domain, prefix in _PLATFORM_PREFIXES:
+                        if hostname == domain or hostname.endswith('.' + domain):
+                            html_body = f'{prefix}<p>{html_body}</p>'
+                            break
             
             # Build Matrix message event
             event_data = {
@@ -223,13 +326,22 @@ class MatrixPlatform:
                 }
             
             # Send message via Matrix Client-Server API
-            url = f"{self.homeserver}/_matrix/client/r0/rooms/{quote(self.room_id)}/send/m.room.message"
-            headers = {
-                "Authorization": f"Bearer {self.access_token}",
-                "Content-Type": "application/json"
-            }
+            # One transaction ID per message - the homeserver drops repeats of the same txnId
+            txn_id = uuid.uuid4().hex
+            url = f"{self.homeserver}/_matrix/client/r0/rooms/{quote(self.room_id)}/send/m.room.message/{txn_id}"
+            headers = {"Authorization": f"Bearer {self.access_token}"}
+            
+            body = _encode_event(event_data)
+            response = self._session.put(url, data=body, headers=headers, timeout=10)
             
-            response = requests.post(url, json=event_data, headers=headers, timeout=10)
+            # A cached or rotated-out token was rejected - log in again and retry once
+            if response.status_code == 401 and self.username and self.password:
+                logger.info("Matrix token rejected, logging in again")
+                fresh_token = self._login_and_get_token(use_cache=False)
+                if fresh_token:
+                    self.access_token = fresh_token
+                    headers = {"Authorization": f"Bearer {self.access_token}"}
+                    response = self._session.put(url, data=body, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -242,3 +354,7 @@ class MatrixPlatform:
         except Exception as e:
             logger.error(f"✗ Matrix post failed: {e}")
             return None
+    
+    def close(self) -> None:
+        """Release pooled connections (call on shutdown)."""
+        self._session.close()
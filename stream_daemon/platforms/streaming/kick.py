@@ -10,27 +10,121 @@ This is what cutting-edge streaming infrastructure looks like in 2026, folks.
 """
 
 import logging
-from typing import Optional, Tuple
+import time
+from typing import Dict, List, Optional, Tuple
 
-import requests
+from urllib3.util.retry import Retry
 
 from stream_daemon.config import get_bool_config, get_secret
 from stream_daemon.platforms.base import StreamingPlatform
+from stream_daemon.utils import TTLCache, create_session
 
 logger = logging.getLogger(__name__)
 
+# Kick's 500s and rate limits are usually gone a second later - let urllib3 retry them on
+# the pooled connection with short jittered backoff (at most _KICK_BACKOFF_MAX per retry,
+# so three retries add seconds, not minutes) before anything counts as an error.
+# urllib3 doesn't honour Retry-After here: _note_rate_limit() reads it from the final
+# response and _get() holds the next request for up to _RATE_LIMIT_MAX_WAIT instead.
+# The token POST is safe to repeat: a second client-credentials grant just issues a new token.
+_KICK_BACKOFF_MAX = 8
+_KICK_RETRY = Retry(
+    total=3,
+    backoff_factor=1.0,
+    backoff_jitter=0.5,
+    backoff_max=_KICK_BACKOFF_MAX,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {'POST'},
+    respect_retry_after_header=False,
+    raise_on_status=False,
+)
+
+# Refresh the app token this long before Kick says it expires (default lifetime: 1h)
+_TOKEN_REFRESH_MARGIN = 60
+_DEFAULT_TOKEN_LIFETIME = 3600
+
+# When Kick says we're nearly out of requests, hold off until the window resets -
+# but never park the whole poll loop for longer than this
+_RATE_LIMIT_LOW_WATER = 2
+_RATE_LIMIT_MAX_WAIT = 30
+
+# Repeat is_live() calls for the same channel within this window reuse the last answer
+_LIVE_CACHE_TTL = 15
+
+# After max_consecutive_errors failures, stop hammering Kick for this long
+_ERROR_COOLDOWN_SECONDS = 600
+
+# Cloudflare in front of kick.com is a lot friendlier to something that looks like a browser
+_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
+
+
+# Official API: one request can ask about up to 50 channels by repeating ?slug=
+_CHANNELS_URL = "https://api.kick.com/public/v1/channels"
+_MAX_SLUGS_PER_REQUEST = 50
+
+# Public fallback: per-channel livestream endpoint, with the extra headers Cloudflare likes
+_PUBLIC_LIVESTREAM_URL = "https://kick.com/api/v2/channels/{}/livestream".format
+_PUBLIC_HEADERS = {
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Referer': 'https://kick.com/'
+}
+
+
+def _parse_channel(channel: dict) -> Optional[dict]:
+    """
+    Pull stream info out of an official-API channel object.
+    
+    Args:
+        channel: One entry of the /channels response 'data' list
+        
+    Returns:
+        dict: stream_data if the channel is live, None otherwise
+    """
+    # Check if livestream is active
+    stream = channel.get('stream') or {}
+    if not stream.get('is_live', False):
+        return None
+    
+    # Extract stream information
+    viewer_count = stream.get('viewer_count')
+    category = channel.get('category', {})
+    return {
+        'title': channel.get('stream_title', 'Live Stream'),
+        'viewer_count': int(viewer_count) if viewer_count is not None else None,
+        'thumbnail_url': stream.get('thumbnail'),
+        'game_name': category.get('name') if isinstance(category, dict) else None,
+    }
+
 
 class KickPlatform(StreamingPlatform):
     """Kick streaming platform with optional authentication."""
     
-    def __init__(self):
+    def __init__(self, cache_ttl: float = _LIVE_CACHE_TTL):
+        """
+        Args:
+            cache_ttl: Seconds to reuse a channel's live check (0 disables)
+        """
         super().__init__("Kick")
         # Note: self.enabled is set to False in parent class
         self.access_token = None
         self.use_auth = False
+        self._client_id = None
+        self._client_secret = None
+        self._token_expiry = 0.0  # time.monotonic() after which the token gets refreshed
+        self._auth_headers = {}  # rebuilt only when the token changes
+        self._rate_limit_reset_at = 0.0  # time.monotonic() when Kick's rate-limit window reopens
         self.consecutive_errors = 0
         self.max_consecutive_errors = 5
-        self.error_cooldown_time = None  # Track when error cooldown started
+        self.error_cooldown_time = None  # time.monotonic() when error cooldown started
+        # username -> (is_live, stream_data); only successful checks are cached
+        self._live_cache = TTLCache(maxsize=256, ttl=cache_ttl) if cache_ttl > 0 else None
+        # Every poll hits the same two hosts (kick.com / api.kick.com) - reuse the connections
+        self._session = create_session(
+            headers={'User-Agent': _USER_AGENT, 'Accept': 'application/json'},
+            pool_connections=3,
+            pool_maxsize=4,
+            retries=_KICK_RETRY,
+        )
         
     def authenticate(self) -> bool:
         """Authenticate with Kick API (optional - falls back to public API)."""
@@ -48,31 +142,14 @@ class KickPlatform(StreamingPlatform):
                                    doppler_secret_env='SECRETS_DOPPLER_KICK_SECRET_NAME')
         
         if client_id and client_secret:
-            # Try to get access token using OAuth client credentials flow
-            try:
-                # Use correct OAuth server endpoint (id.kick.com, not api.kick.com)
-                token_url = "https://id.kick.com/oauth/token"
-                headers = {
-                    'Content-Type': 'application/x-www-form-urlencoded'
-                }
-                data = {
-                    'grant_type': 'client_credentials',
-                    'client_id': client_id,
-                    'client_secret': client_secret
-                }
-                response = requests.post(token_url, data=data, headers=headers, timeout=10)
-                
-                if response.status_code == 200:
-                    token_data = response.json()
-                    self.access_token = token_data.get('access_token')
-                    self.use_auth = True
-                    self.enabled = True
-                    logger.info("✓ Kick authenticated (using official API)")
-                    return True
-                else:
-                    logger.warning(f"⚠ Kick authentication failed (status {response.status_code}), falling back to public API")
-            except Exception as e:
-                logger.warning(f"⚠ Kick authentication error: {e}, falling back to public API")
+            self._client_id = client_id
+            self._client_secret = client_secret
+            if self._fetch_token():
+                self.use_auth = True
+                self.enabled = True
+                logger.info("✓ Kick authenticated (using official API)")
+                return True
+            logger.warning("⚠ Falling back to Kick public API")
         
         # Fall back to public API
         # Translation: Their OAuth is unreliable, so we just... look at their website like a normal person
@@ -82,6 +159,129 @@ class KickPlatform(StreamingPlatform):
         logger.info("✓ Kick enabled (using public API)")
         return True
     
+    def _fetch_token(self) -> bool:
+        """
+        Get an app access token with the OAuth client credentials flow.
+        
+        Returns:
+            bool: True if a new token was stored
+        """
+        try:
+            # Use correct OAuth server endpoint (id.kick.com, not api.kick.com)
+            token_url = "https://id.kick.com/oauth/token"
+            headers = {
+                'Content-Type': 'application/x-www-form-urlencoded'
+            }
+            data = {
+                'grant_type': 'client_credentials',
+                'client_id': self._client_id,
+                'client_secret': self._client_secret
+            }
+            response = self._session.post(token_url, data=data, headers=headers, timeout=10)
+            
+            if response.status_code != 200:
+                logger.warning(f"⚠ Kick authentication failed (status {response.status_code})")
+                return False
+            
+            token_data = response.json()
+            access_token = token_data.get('access_token')
+            if not access_token:
+                logger.warning("⚠ Kick authentication returned no access token")
+                return False
+            
+            lifetime = token_data.get('expires_in') or _DEFAULT_TOKEN_LIFETIME
+            self.access_token = access_token
+            self._auth_headers = {'Authorization': f'Bearer {access_token}'}
+            self._token_expiry = time.monotonic() + max(0, lifetime - _TOKEN_REFRESH_MARGIN)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠ Kick authentication error: {e}")
+            return False
+    
+    def _ensure_token(self) -> bool:
+        """
+        Refresh the app token if it's about to expire.
+        
+        Returns:
+            bool: True if a usable token is available
+        """
+        if self.access_token and time.monotonic() < self._token_expiry:
+            return True
+        logger.info("Refreshing Kick access token")
+        return self._fetch_token()
+    
+    def _get(self, url: str, **kwargs):
+        """
+        GET through the pooled session, pacing requests by Kick's rate-limit headers.
+        
+        Args:
+            url: Request URL
+            **kwargs: Passed through to requests (headers, params, timeout)
+            
+        Returns:
+            requests.Response
+        """
+        wait = self._rate_limit_reset_at - time.monotonic()
+        if wait > 0:
+            wait = min(wait, _RATE_LIMIT_MAX_WAIT)
+            logger.info(f"Kick rate limit nearly used up, waiting {wait:.1f}s")
+            time.sleep(wait)
+        
+        response = self._session.get(url, **kwargs)
+        self._note_rate_limit(response)
+        return response
+    
+    def _note_rate_limit(self, response) -> None:
+        """
+        Remember when to slow down, from Retry-After or X-RateLimit-* response headers.
+        
+        Args:
+            response: Any response from Kick
+        """
+        try:
+            if response.status_code == 429 and response.headers.get('Retry-After'):
+                reset_in = float(response.headers['Retry-After'])
+            elif int(response.headers.get('X-RateLimit-Remaining', _RATE_LIMIT_LOW_WATER)) < _RATE_LIMIT_LOW_WATER:
+                reset = float(response.headers.get('X-RateLimit-Reset', 0))
+                # Some APIs send an epoch timestamp, others seconds-until-reset
+                reset_in = reset - time.time() if reset > 1e9 else reset
+            else:
+                return
+        except (TypeError, ValueError):
+            # Missing or unparseable (e.g. HTTP-date Retry-After) - nothing to pace by
+            return
+        
+        if reset_in > 0:
+            self._rate_limit_reset_at = max(self._rate_limit_reset_at, time.monotonic() + reset_in)
+    
+    def _in_error_cooldown(self) -> bool:
+        """
+        Check the error cooldown (10 minutes after hitting max errors), starting or ending it as needed.
+        
+        Returns:
+            bool: True if Kick checks should be skipped right now
+        """
+        if self.consecutive_errors < self.max_consecutive_errors:
+            return False
+        
+        if self.error_cooldown_time is not None:
+            elapsed = time.monotonic() - self.error_cooldown_time
+            if elapsed < _ERROR_COOLDOWN_SECONDS:
+                # Still in cooldown period
+                remaining_min = int(_ERROR_COOLDOWN_SECONDS - elapsed) // 60
+                logger.debug(f"Kick in error cooldown (cooldown: {remaining_min} min remaining)")
+                return True
+            # Cooldown expired, reset and try again
+            logger.info(f"Kick error cooldown expired, resetting error count and resuming checks")
+            self.consecutive_errors = 0
+            self.error_cooldown_time = None
+            return False
+        
+        # First time hitting max errors - start cooldown
+        self.error_cooldown_time = time.monotonic()
+        logger.warning(f"⚠ Kick disabled temporarily due to {self.consecutive_errors} consecutive errors (10 minute cooldown)")
+        return True
+    
     def is_live(self, username: str) -> Tuple[bool, Optional[dict]]:
         """
         Check if Kick stream is live.
@@ -95,35 +295,21 @@ class KickPlatform(StreamingPlatform):
         if not self.enabled:
             return False, None
         
-        # Check if we're in error cooldown period (10 minutes after hitting max errors)
-        if self.consecutive_errors >= self.max_consecutive_errors:
-            if self.error_cooldown_time:
-                from datetime import datetime, timedelta
-                time_since_error = datetime.now() - self.error_cooldown_time
-                if time_since_error < timedelta(minutes=10):
-                    # Still in cooldown period
-                    remaining_min = 10 - (time_since_error.seconds // 60)
-                    logger.debug(f"Kick in error cooldown (cooldown: {remaining_min} min remaining)")
-                    return False, None
-                else:
-                    # Cooldown expired, reset and try again
-                    logger.info(f"Kick error cooldown expired, resetting error count and resuming checks")
-                    self.consecutive_errors = 0
-                    self.error_cooldown_time = None
-            else:
-                # First time hitting max errors - start cooldown
-                from datetime import datetime
-                self.error_cooldown_time = datetime.now()
-                logger.warning(f"⚠ Kick disabled temporarily due to {self.consecutive_errors} consecutive errors (10 minute cooldown)")
-                return False, None
+        if self._in_error_cooldown():
+            return False, None
+        
+        if self._live_cache is not None:
+            cached = self._live_cache.get(username)
+            if cached is not None:
+                return cached
         
         try:
             if self.use_auth and self.access_token:
                 # Use official authenticated API
-                return self._check_authenticated(username)
+                result = self._check_authenticated(username)
             else:
                 # Fall back to public scraping API
-                return self._check_public(username)
+                result = self._check_public(username)
         except Exception as e:
             self.consecutive_errors += 1
             error_str = str(e)
@@ -154,60 +340,114 @@ class KickPlatform(StreamingPlatform):
                 logger.error(f"   ⏰ Kick will enter cooldown to prevent API abuse")
             
             return False, None
+        
+        if self._live_cache is not None:
+            self._live_cache.set(username, result)
+        return result
+    
+    def is_live_batch(self, usernames: List[str]) -> Dict[str, Tuple[bool, Optional[dict]]]:
+        """
+        Check several Kick channels, in one request per chunk when authenticated.
+        
+        The official /channels endpoint takes repeated slug parameters, so the whole
+        list costs one round-trip instead of one per channel. Without a token (or with
+        a single channel) this is just is_live() in a loop.
+        
+        Args:
+            usernames: Kick usernames to check
+            
+        Returns:
+            dict: username -> (is_live, stream_data)
+        """
+        if not (self.enabled and self.use_auth and len(usernames) > 1):
+            return {username: self.is_live(username) for username in usernames}
+        
+        if self._in_error_cooldown():
+            return {username: (False, None) for username in usernames}
+        
+        results = {}
+        if self._live_cache is not None:
+            for username in usernames:
+                cached = self._live_cache.get(username)
+                if cached is not None:
+                    results[username] = cached
+        pending = [username for username in usernames if username not in results]
+        
+        answered = False
+        try:
+            for start in range(0, len(pending), _MAX_SLUGS_PER_REQUEST):
+                chunk = pending[start:start + _MAX_SLUGS_PER_REQUEST]
+                channels = self._fetch_channels([('slug', username) for username in chunk])
+                if channels is None:
+                    break
+                
+                answered = True
+                by_slug = {str(channel.get('slug', '')).lower(): channel for channel in channels}
+                for username in chunk:
+                    # Not in the response = no such channel, same as an empty single lookup
+                    stream_data = _parse_channel(by_slug.get(username.lower(), {}))
+                    results[username] = (stream_data is not None, stream_data)
+                    if self._live_cache is not None:
+                        self._live_cache.set(username, results[username])
+            if answered:
+                # Reset error counter on success
+                self.consecutive_errors = 0
+        except Exception as e:
+            logger.warning(f"Batched Kick check failed ({type(e).__name__}): {e}, checking channels one by one")
+        
+        # Whatever the batch couldn't answer gets the regular per-channel check
+        for username in usernames:
+            if username not in results:
+                results[username] = self.is_live(username)
+        return results
+    
+    def _fetch_channels(self, params) -> Optional[List[dict]]:
+        """
+        Query the official /channels endpoint with the app token.
+        
+        Args:
+            params: Query parameters (one or more 'slug' entries)
+            
+        Returns:
+            list: Channel objects from the response, or None if the authenticated API didn't answer
+        """
+        if not self._ensure_token():
+            logger.warning("Kick token refresh failed, falling back to public API")
+            return None
+        
+        response = self._get(_CHANNELS_URL, headers=self._auth_headers, params=params, timeout=10)
+        
+        if response.status_code == 401:
+            # Token revoked or expired early - get a new one and try once more
+            self._token_expiry = 0.0
+            if self._ensure_token():
+                response = self._get(_CHANNELS_URL, headers=self._auth_headers, params=params, timeout=10)
+        
+        if response.status_code != 200:
+            logger.warning(f"Kick channels API failed: {response.status_code}, falling back to public API")
+            return None
+        
+        return response.json().get('data') or []
     
     def _check_authenticated(self, username: str) -> Tuple[bool, Optional[dict]]:
         """Check stream status using authenticated official Kick API."""
         try:
             # Use the /channels endpoint with slug parameter (works better than searching livestreams)
-            channels_url = "https://api.kick.com/public/v1/channels"
-            headers = {
-                'Authorization': f'Bearer {self.access_token}',
-                'Accept': 'application/json',
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            params = {'slug': username}
-            response = requests.get(channels_url, headers=headers, params=params, timeout=10)
-            
-            if response.status_code != 200:
-                logger.warning(f"Kick channels API failed: {response.status_code}, falling back to public API")
+            channels = self._fetch_channels({'slug': username})
+            if channels is None:
                 return self._check_public(username)
             
-            result = response.json()
-            channels = result.get('data', [])
-            
             if not channels:
                 # Channel not found or offline
                 return False, None
             
-            channel = channels[0]
-            
-            # Check if livestream is active
-            stream = channel.get('stream', {})
-            is_live = stream.get('is_live', False)
-            
-            if not is_live:
+            stream_data = _parse_channel(channels[0])
+            if stream_data is None:
                 return False, None
             
-            # Extract stream information
-            stream_title = channel.get('stream_title', 'Live Stream')
-            viewer_count = stream.get('viewer_count')
-            thumbnail_url = stream.get('thumbnail')
-            
-            category = channel.get('category', {})
-            game_name = category.get('name') if isinstance(category, dict) else None
-            
-            stream_data = {
-                'title': stream_title,
-                'viewer_count': int(viewer_count) if viewer_count is not None else None,
-                'thumbnail_url': thumbnail_url,
-                'game_name': game_name
-            }
-            
             # Reset error counter on success
             self.consecutive_errors = 0
             return True, stream_data
-
             
         except Exception as e:
             error_str = str(e)
@@ -228,14 +468,7 @@ class KickPlatform(StreamingPlatform):
         """Check stream status using public API (fallback)."""
         try:
             # Old public API endpoint
-            url = f"https://kick.com/api/v2/channels/{username}/livestream"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-                'Accept': 'application/json',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Referer': 'https://kick.com/'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self._get(_PUBLIC_LIVESTREAM_URL(username), headers=_PUBLIC_HEADERS, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -264,3 +497,7 @@ class KickPlatform(StreamingPlatform):
             
         except Exception as e:
             raise  # Re-raise to be caught by parent
+    
+    def close(self) -> None:
+        """Release pooled HTTP connections."""
+        self._session.close()
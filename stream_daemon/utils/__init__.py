@@ -1,5 +1,7 @@
 """Utility functions."""
 
 from .messages import parse_sectioned_message_file
+from .http import create_session
+from .cache import TTLCache
 
-__all__ = ['parse_sectioned_message_file']
+__all__ = ['parse_sectioned_message_file', 'create_session', 'TTLCache']
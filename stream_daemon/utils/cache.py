@@ -0,0 +1,186 @@
+"""Small in-process caches.
+
+Stream-Daemon posts about the same handful of URLs over and over - every threaded
+reply for a broadcast links the same stream page and the same thumbnail. Asking the
+internet the same question every few minutes is a great way to burn API quota on
+answers you already had. (And if a deploy restarts the daemon, the answers can be
+saved to disk first.)
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a fixed time-to-live.
+
+    Expired entries are dropped lazily on lookup; the least recently used entry
+    is evicted once maxsize is reached.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 300):
+        """
+        Args:
+            maxsize: Maximum number of entries kept
+            ttl: Seconds an entry stays valid after it was stored
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """
+        Look up a live entry.
+
+        Args:
+            key: Cache key
+            default: Returned when the key is missing or expired
+
+        Returns:
+            Cached value, or default
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Seconds this entry stays valid (default: the cache's ttl)
+        """
+        if ttl is None:
+            ttl = self.ttl
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """
+        Remove an entry.
+
+        Args:
+            key: Cache key
+            default: Returned when the key is missing or expired
+
+        Returns:
+            The removed value, or default
+        """
+        with self._lock:
+            entry = self._data.pop(key, None)
+        if entry is None or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """
+        Snapshot the live entries, least recently used first.
+
+        Returns:
+            List of (key, value) pairs
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (expires_at, value) in self._data.items() if expires_at > now]
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def save(self, path: str) -> None:
+        """
+        Write live entries to a JSON file, atomically.
+
+        Keys must be strings and values JSON-serializable. Expiry is stored as
+        wall-clock time so entries keep their remaining TTL across restarts.
+
+        Args:
+            path: Destination file (written via a temp file + os.replace)
+
+        Raises:
+            OSError: If the file can't be written
+            TypeError: If an entry isn't JSON-serializable
+        """
+        now_mono, now_wall = time.monotonic(), time.time()
+        with self._lock:
+            items = [[key, value, now_wall + (expires_at - now_mono)]
+                     for key, (expires_at, value) in self._data.items()
+                     if expires_at > now_mono]
+
+        # Readers never see a half-written file: write alongside, then swap in
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.cache-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(items, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def load(self, path: str) -> int:
+        """
+        Merge entries previously written by save(), skipping expired ones.
+
+        JSON has no tuples, so tuple values come back as lists.
+
+        Args:
+            path: File written by save()
+
+        Returns:
+            Number of entries loaded
+
+        Raises:
+            OSError: If the file can't be read
+            ValueError: If the file isn't valid cache JSON
+            TypeError: If the JSON isn't shaped like save() output
+        """
+        with open(path, encoding='utf-8') as f:
+            items = json.load(f)
+
+        now_mono, now_wall = time.monotonic(), time.time()
+        loaded = 0
+        with self._lock:
+            for key, value, expires_wall in items:
+                remaining = expires_wall - now_wall
+                if remaining <= 0:
+                    continue
+                # Never trust a file to extend an entry past our own TTL
+                self._data[key] = (now_mono + min(remaining, self.ttl), value)
+                self._data.move_to_end(key)
+                loaded += 1
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return loaded
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+_MISSING = object()
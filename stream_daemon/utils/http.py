@@ -0,0 +1,43 @@
+"""HTTP session helpers.
+
+Every platform talks to the same handful of hosts over and over (Discord's webhook
+endpoint, the Kick API, whatever CDN serves Twitch thumbnails this week). Opening a
+brand new TCP + TLS connection for each of those calls is how you spend 200ms saying
+hello to a server you already said hello to a minute ago.
+"""
+
+import logging
+from typing import Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+def create_session(headers: Optional[dict] = None,
+                   pool_connections: int = 4,
+                   pool_maxsize: int = 8,
+                   retries: Union[int, Retry] = 0) -> requests.Session:
+    """
+    Create a requests.Session with a connection pool mounted for http(s).
+    
+    Args:
+        headers: Default headers sent with every request (per-call headers still merge)
+        pool_connections: Number of per-host connection pools to cache
+        pool_maxsize: Maximum connections kept alive per host
+        retries: urllib3 retry policy (or retry count) for the adapters; 0 disables retries
+        
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                          max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
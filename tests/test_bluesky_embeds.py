@@ -0,0 +1,594 @@
+"""
+Tests for the Bluesky embed card helpers (Open Graph parsing, rich text).
+
+No network, no Bluesky account - just the pure functions that decide what
+ends up in the link card.
+"""
+
+import httpx
+import pytest
+import requests
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from unittest.mock import MagicMock, Mock, patch
+from atproto import exceptions as atproto_exceptions, models
+from stream_daemon.platforms.social.bluesky import (
+    BlueskyPlatform,
+    _parse_meta_tags,
+    _tokenize_rich_text,
+    _stream_platform_for_url,
+    _MAX_HTML_BYTES,
+    _MAX_THUMB_BYTES,
+    _OG_CACHE,
+    _REPLY_REF_CACHE,
+    _is_transient_error,
+    _with_retries,
+)
+
+
+def _streamed_response(chunks, content_type='text/html; charset=utf-8'):
+    """Build a fake streamed requests response yielding the given byte chunks."""
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.headers = {'content-type': content_type}
+    response.encoding = 'utf-8' if 'charset=' in content_type else 'ISO-8859-1'
+    response.iter_content.return_value = iter(chunks)
+    return response
+
+
+def _image_response(chunks, content_type='image/jpeg', content_length=None, status_code=200):
+    """Build a fake streamed image response yielding the given byte chunks."""
+    response = MagicMock(status_code=status_code)
+    response.__enter__.return_value = response
+    response.headers = {'Content-Type': content_type}
+    if content_length is not None:
+        response.headers['Content-Length'] = str(content_length)
+    response.iter_content.return_value = iter(chunks)
+    return response
+
+
+class TestMetaTagParsing:
+    """Test suite for single-pass Open Graph / Twitter Card extraction."""
+    
+    def test_open_graph_tags(self):
+        """Valid: og:* properties are collected by property name."""
+        html = '''<html><head>
+            <meta property="og:title" content="Stream Title">
+            <meta property="og:description" content="Playing games">
+            <meta property="og:image" content="https://example.com/thumb.jpg" />
+        </head><body></body></html>'''
+        meta = _parse_meta_tags(html)
+        assert meta['og:title'] == 'Stream Title'
+        assert meta['og:description'] == 'Playing games'
+        assert meta['og:image'] == 'https://example.com/thumb.jpg'
+    
+    def test_twitter_card_tags(self):
+        """Valid: twitter:* cards use the name attribute."""
+        html = '<head><meta name="twitter:title" content="Tweet Title"></head>'
+        assert _parse_meta_tags(html)['twitter:title'] == 'Tweet Title'
+    
+    def test_first_occurrence_wins(self):
+        """Valid: Duplicate tags keep the first value in document order."""
+        html = '<meta property="og:title" content="First"><meta property="og:title" content="Second">'
+        assert _parse_meta_tags(html)['og:title'] == 'First'
+    
+    def test_empty_content_ignored(self):
+        """Edge case: Tags without content don't shadow later fallbacks."""
+        html = '<meta property="og:title" content=""><meta property="og:title" content="Real">'
+        assert _parse_meta_tags(html)['og:title'] == 'Real'
+    
+    def test_entities_unescaped(self):
+        """Valid: HTML entities in attribute values are decoded."""
+        html = '<meta property="og:title" content="Rock &amp; Roll">'
+        assert _parse_meta_tags(html)['og:title'] == 'Rock & Roll'
+    
+    def test_no_meta_tags(self):
+        """Edge case: Pages without meta tags return an empty dict."""
+        assert _parse_meta_tags('<html><body>nothing here</body></html>') == {}
+    
+    def test_stops_at_end_of_head(self):
+        """Valid: Meta tags after </head> (e.g., in embedded widgets) are ignored."""
+        html = '''<head><meta name="twitter:title" content="Head"></head>
+            <body><meta property="og:title" content="Body widget"></body>'''
+        assert _parse_meta_tags(html) == {'twitter:title': 'Head'}
+    
+    def test_stops_once_card_complete(self):
+        """Valid: Parsing ends once og title, description and image are all found."""
+        html = (
+            '<meta property="og:title" content="T">'
+            '<meta property="og:description" content="D">'
+            '<meta property="og:image" content="I">'
+            '<meta name="twitter:title" content="Never read">'
+        )
+        assert 'twitter:title' not in _parse_meta_tags(html)
+
+
+class TestHtmlHeadFetch:
+    """Test suite for the size-capped page download used by link cards."""
+    
+    @pytest.fixture
+    def platform(self):
+        """Bluesky platform with a mocked HTTP session."""
+        platform = BlueskyPlatform()
+        platform._http = Mock()
+        return platform
+    
+    def test_stops_at_head_end(self, platform):
+        """Valid: Reading stops once </head> has been received."""
+        chunks = [b'<head><meta property="og:title" content="x">', b'</head>', b'<body>never read</body>']
+        response = _streamed_response(chunks)
+        platform._http.get.return_value = response
+        
+        html = platform._fetch_html_head('https://example.com')
+        
+        assert html.endswith('</head>')
+        assert 'never read' not in html
+        response.__exit__.assert_called_once()
+    
+    def test_head_end_split_across_chunks(self, platform):
+        """Edge case: A </head> split over two chunks still ends the download."""
+        chunks = [b'<head><title>x</title></he', b'ad>', b'<body>never read</body>']
+        platform._http.get.return_value = _streamed_response(chunks)
+        
+        html = platform._fetch_html_head('https://example.com')
+        
+        assert html.endswith('</head>')
+    
+    def test_caps_download_size(self, platform):
+        """Valid: Pages without </head> are cut off at the byte cap."""
+        chunk = b'a' * 8192
+        platform._http.get.return_value = _streamed_response([chunk] * 100)
+        
+        html = platform._fetch_html_head('https://example.com')
+        
+        assert len(html) == _MAX_HTML_BYTES
+    
+    def test_defaults_to_utf8_without_charset(self, platform):
+        """Valid: Missing charset decodes as UTF-8 rather than ISO-8859-1."""
+        platform._http.get.return_value = _streamed_response(
+            ['<meta property="og:title" content="Café">'.encode('utf-8')],
+            content_type='text/html'
+        )
+        
+        assert 'Café' in platform._fetch_html_head('https://example.com')
+
+
+def _segments(message):
+    """Tokenize a message and slice its spans back into (kind, text) pairs."""
+    spans, first_url = _tokenize_rich_text(message)
+    return [(kind, message[start:end]) for kind, start, end in spans], first_url
+
+
+class TestRichTextTokenizer:
+    """Test suite for splitting posts into text/link/hashtag spans."""
+    
+    def test_links_and_tags(self):
+        """Valid: URLs and hashtags are split out in message order."""
+        segments, first_url = _segments("Live now https://twitch.tv/user #gaming")
+        assert segments == [
+            ('text', 'Live now '),
+            ('link', 'https://twitch.tv/user'),
+            ('text', ' '),
+            ('tag', '#gaming'),
+        ]
+        assert first_url == 'https://twitch.tv/user'
+    
+    def test_spans_are_offsets(self):
+        """Valid: Spans index into the original message."""
+        spans, _ = _tokenize_rich_text("hi #tag")
+        assert spans == [('text', 0, 3), ('tag', 3, 7)]
+    
+    def test_first_url_only(self):
+        """Valid: Only the first URL is reported for the embed card."""
+        _, first_url = _segments("#live https://a.example/1 and https://b.example/2")
+        assert first_url == 'https://a.example/1'
+    
+    def test_plain_text(self):
+        """Edge case: Messages without links or tags are a single text span."""
+        assert _segments("just text") == ([('text', 'just text')], None)
+    
+    def test_no_empty_text_segments(self):
+        """Edge case: Adjacent tokens don't produce empty text spans."""
+        segments, _ = _segments("#one#two")
+        assert segments == [('tag', '#one'), ('tag', '#two')]
+    
+    def test_empty_message(self):
+        """Edge case: Empty message produces no spans."""
+        assert _tokenize_rich_text("") == ([], None)
+    
+    def test_fast_path_matches_regex_path(self):
+        """Edge case: Messages with '#' or 'http' that aren't tokens still come back as plain text."""
+        assert _segments("C# and http talk") == ([('text', 'C# and http talk')], None)
+
+
+class TestStreamUrlClassification:
+    """Test suite for picking the card style from the first URL's host."""
+    
+    @pytest.mark.parametrize('url,expected', [
+        ('https://kick.com/user', 'kick'),
+        ('https://www.twitch.tv/user', 'twitch'),
+        ('https://m.youtube.com/watch?v=abc', 'youtube'),
+        ('https://youtu.be/abc', 'youtube'),
+        ('https://WWW.TWITCH.TV/user', 'twitch'),
+        ('https://twitch.tv:443/user', 'twitch'),
+        ('https://user@kick.com/user', 'kick'),
+        ('https://youtu.be', 'youtube'),
+        ('https://example.com/page', None),
+    ])
+    def test_known_platforms(self, url, expected):
+        """Valid: Streaming platform hosts (and subdomains) are recognised."""
+        assert _stream_platform_for_url(url) == expected
+    
+    @pytest.mark.parametrize('url', [
+        'https://eviltwitch.tv/phishing',
+        'https://twitch.tv.evil.com/phishing',
+        'https://fakekick.com/scam',
+        'https://twitch.tv@evil.com/phishing',
+        'https://evil.com/?next=https://twitch.tv/',
+    ])
+    def test_lookalike_domains(self, url):
+        """Security: Lookalike domains are not treated as streaming platforms."""
+        assert _stream_platform_for_url(url) is None
+    
+    def test_unparseable_url(self):
+        """Edge case: URLs without a host classify as nothing."""
+        assert _stream_platform_for_url('https://[invalid') is None
+        assert _stream_platform_for_url('not-a-url') is None
+
+
+class TestStreamEmbed:
+    """Test suite for link cards built from stream metadata."""
+    
+    @pytest.fixture
+    def platform(self):
+        platform = BlueskyPlatform()
+        platform._http = Mock()
+        platform.client = Mock()
+        return platform
+    
+    def test_card_from_stream_data(self, platform):
+        """Valid: Title, game and uploaded thumbnail end up in the card."""
+        platform._http.get.return_value = _image_response([b'jpeg', b'bytes'])
+        blob = models.blob_ref.BlobRef(
+            mime_type='image/jpeg', size=9,
+            ref=models.blob_ref.IpldLink(link='bafkreibme22gw2h7y2h7tg2fhqotaqjucnbc24deqo72b6mkl2egezxhvy')
+        )
+        platform.client.upload_blob.return_value = Mock(blob=blob)
+        
+        embed = platform._build_stream_embed(
+            'https://twitch.tv/user',
+            {'title': 'Ranked grind', 'game_name': 'Valorant', 'thumbnail_url': 'https://cdn.example/t.jpg'},
+            'Live Stream'
+        )
+        
+        assert embed.external.uri == 'https://twitch.tv/user'
+        assert embed.external.title == 'Ranked grind'
+        assert embed.external.description == '🔴 LIVE • Valorant'
+        assert embed.external.thumb == blob
+        platform.client.upload_blob.assert_called_once_with(b'jpegbytes')
+    
+    def test_fallback_title_without_thumbnail(self, platform):
+        """Edge case: Empty title uses the platform fallback; no thumbnail means no upload."""
+        embed = platform._build_stream_embed('https://kick.com/user', {'title': ''}, 'Live on Kick')
+        
+        assert embed.external.title == 'Live on Kick'
+        assert embed.external.description == '🔴 LIVE'
+        assert embed.external.thumb is None
+        platform._http.get.assert_not_called()
+
+
+class TestThumbnailDownload:
+    """Test suite for the size/type guards on link card thumbnails."""
+    
+    @pytest.fixture
+    def platform(self):
+        platform = BlueskyPlatform()
+        platform._http = Mock()
+        return platform
+    
+    def test_small_image(self, platform):
+        """Valid: A small image is returned whole and the connection released."""
+        response = _image_response([b'abc', b'def'], content_length=6)
+        platform._http.get.return_value = response
+        
+        assert platform._download_thumbnail('https://cdn.example/t.jpg') == b'abcdef'
+        response.__exit__.assert_called_once()
+    
+    def test_rejects_non_image(self, platform):
+        """Invalid: An HTML error page served at an image URL is never read."""
+        response = _image_response([b'<html>'], content_type='text/html')
+        platform._http.get.return_value = response
+        
+        assert platform._download_thumbnail('https://cdn.example/t.jpg') is None
+        response.iter_content.assert_not_called()
+    
+    def test_rejects_declared_oversize(self, platform):
+        """Invalid: A Content-Length over the cap skips the download entirely."""
+        response = _image_response([b'x'], content_length=_MAX_THUMB_BYTES + 1)
+        platform._http.get.return_value = response
+        
+        assert platform._download_thumbnail('https://cdn.example/t.jpg') is None
+        response.iter_content.assert_not_called()
+    
+    def test_rejects_undeclared_oversize(self, platform):
+        """Edge case: Without a Content-Length, streaming stops once the cap is passed."""
+        chunk = b'x' * 65536
+        chunks = iter([chunk] * 100)
+        platform._http.get.return_value = _image_response(chunks)
+        
+        assert platform._download_thumbnail('https://cdn.example/t.jpg') is None
+        # Stopped just past the cap, not after reading all 100 chunks
+        assert len(list(chunks)) == 100 - (_MAX_THUMB_BYTES // len(chunk) + 1)
+    
+    def test_http_error(self, platform):
+        """Invalid: Non-200 responses yield no thumbnail."""
+        platform._http.get.return_value = _image_response([b'x'], status_code=404)
+        
+        assert platform._download_thumbnail('https://cdn.example/t.jpg') is None
+
+
+class TestPostPipelining:
+    """Test suite for work overlapped on the Bluesky I/O pool."""
+    
+    @pytest.fixture
+    def platform(self):
+        platform = BlueskyPlatform()
+        platform._http = Mock()
+        platform.client = Mock()
+        platform.enabled = True
+        return platform
+    
+    def test_thumbnail_timeout_posts_without_thumb(self, platform):
+        """Edge case: A stuck thumbnail upload doesn't hold the post hostage."""
+        future = Mock()
+        future.result.side_effect = FutureTimeoutError()
+        
+        assert platform._thumbnail_result(future) is None
+        assert platform._thumbnail_result(None) is None
+    
+    def test_reply_parent_fetched_once(self, platform):
+        """Valid: Threaded replies look up the parent once, then reuse the cached reference."""
+        parent = Mock()
+        parent.record.reply = None
+        platform.client.app.bsky.feed.get_posts.return_value = Mock(posts=[parent])
+        platform.client.send_post.return_value = Mock(uri='at://did:plc:me/post/2')
+        _REPLY_REF_CACHE.clear()
+        
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(models, 'create_strong_ref', lambda post: Mock())
+            mp.setattr(models.AppBskyFeedPost, 'ReplyRef', lambda parent, root: Mock())
+            uri = platform.post('Still live #gaming', reply_to_id='at://did:plc:me/post/1')
+            platform.post('Still live, still #gaming', reply_to_id='at://did:plc:me/post/1')
+        _REPLY_REF_CACHE.clear()
+        
+        assert uri == 'at://did:plc:me/post/2'
+        platform.client.app.bsky.feed.get_posts.assert_called_once_with({'uris': ['at://did:plc:me/post/1']})
+        assert all(c.kwargs['reply_to'] is not None for c in platform.client.send_post.call_args_list)
+        assert platform.client.send_post.call_count == 2
+    
+    def test_close_releases_own_pool_only(self, platform):
+        """Valid: close() stops this account's I/O pool but leaves the shared HTTP session open."""
+        other = BlueskyPlatform()
+        platform.close()
+        platform._http.close.assert_not_called()
+        with pytest.raises(RuntimeError):
+            platform._io_pool.submit(print)
+        assert other._io_pool.submit(int).result() == 0
+        other.close()
+    
+    def test_close_shared_session(self):
+        """Valid: The shared session is closed once, at process shutdown."""
+        with patch('stream_daemon.platforms.social.bluesky._HTTP') as http:
+            BlueskyPlatform.close_shared_session()
+        http.close.assert_called_once()
+
+
+class TestLinkCardCaching:
+    """Test suite for reusing scraped metadata and uploaded thumbnails."""
+    
+    @pytest.fixture
+    def platform(self):
+        _OG_CACHE.clear()
+        platform = BlueskyPlatform()
+        platform._http = Mock()
+        platform.client = Mock()
+        yield platform
+        _OG_CACHE.clear()
+    
+    def test_og_scrape_cached(self, platform):
+        """Valid: A second card for the same URL doesn't re-scrape the page."""
+        platform._fetch_html_head = Mock(return_value=(
+            '<head><meta property="og:title" content="Title">'
+            '<meta property="og:image" content="/thumb.jpg"></head>'
+        ))
+        
+        first = platform._fetch_og('https://example.com/page')
+        second = platform._fetch_og('https://example.com/page')
+        
+        assert first == second == ('Title', '', 'https://example.com/thumb.jpg')
+        platform._fetch_html_head.assert_called_once()
+    
+    @pytest.mark.parametrize('image,expected', [
+        ('//cdn.example.com/t.jpg', 'https://cdn.example.com/t.jpg'),
+        ('/img/t.jpg', 'https://example.com/img/t.jpg'),
+        ('t.jpg', 'https://example.com/blog/t.jpg'),
+        ('https://cdn.example.com/t.jpg', 'https://cdn.example.com/t.jpg'),
+    ])
+    def test_relative_image_urls(self, platform, image, expected):
+        """Valid: Relative og:image URLs are resolved against the page URL."""
+        platform._fetch_html_head = Mock(return_value=f'<meta property="og:image" content="{image}">')
+        
+        _, _, image_url = platform._fetch_og('https://example.com/blog/post')
+        
+        assert image_url == expected
+    
+    def test_blob_reused_when_cacheable(self, platform):
+        """Valid: Cacheable thumbnails upload once per image URL."""
+        platform._download_thumbnail = Mock(return_value=b'img')
+        platform.client.upload_blob.return_value = Mock(blob='blob-ref')
+        
+        assert platform._upload_thumbnail('https://example.com/t.jpg', cache=True) == 'blob-ref'
+        assert platform._upload_thumbnail('https://example.com/t.jpg', cache=True) == 'blob-ref'
+        platform.client.upload_blob.assert_called_once()
+    
+    def test_stream_thumbnails_not_cached(self, platform):
+        """Edge case: Live thumbnails change under the same URL, so they're re-uploaded."""
+        platform._download_thumbnail = Mock(return_value=b'img')
+        platform.client.upload_blob.return_value = Mock(blob='blob-ref')
+        
+        platform._upload_thumbnail('https://cdn.example/live.jpg')
+        platform._upload_thumbnail('https://cdn.example/live.jpg')
+        
+        assert platform.client.upload_blob.call_count == 2
+    
+    def test_failed_upload_not_cached(self, platform):
+        """Invalid: A failed upload is retried on the next post."""
+        platform._download_thumbnail = Mock(return_value=None)
+        
+        assert platform._upload_thumbnail('https://example.com/t.jpg', cache=True) is None
+        assert 'https://example.com/t.jpg' not in platform._blob_cache
+
+
+class TestApiRetries:
+    """Test suite for retrying transient Bluesky API failures."""
+    
+    @pytest.fixture(autouse=True)
+    def no_sleep(self):
+        with patch('stream_daemon.platforms.social.bluesky.time.sleep') as sleep:
+            yield sleep
+    
+    def test_transient_error_retried(self, no_sleep):
+        """Valid: Network errors are retried with exponential backoff."""
+        fn = Mock(side_effect=[atproto_exceptions.NetworkError(), atproto_exceptions.NetworkError(), 'ok'])
+        
+        assert _with_retries(fn, 'arg') == 'ok'
+        assert fn.call_count == 3
+        assert [c.args[0] for c in no_sleep.call_args_list] == [1, 2]
+    
+    def test_gives_up_after_attempts(self, no_sleep):
+        """Invalid: Persistent failures re-raise after the last attempt."""
+        fn = Mock(side_effect=atproto_exceptions.NetworkError())
+        
+        with pytest.raises(atproto_exceptions.NetworkError):
+            _with_retries(fn)
+        assert fn.call_count == 3
+    
+    def test_client_errors_not_retried(self, no_sleep):
+        """Invalid: 4xx errors fail immediately - retrying won't fix a bad request."""
+        fn = Mock(side_effect=atproto_exceptions.BadRequestError())
+        
+        with pytest.raises(atproto_exceptions.BadRequestError):
+            _with_retries(fn)
+        fn.assert_called_once()
+        no_sleep.assert_not_called()
+    
+    def test_server_errors_retried(self, no_sleep):
+        """Valid: 5xx and 429 responses are retried; other statuses aren't."""
+        assert _is_transient_error(atproto_exceptions.RequestException(Mock(status_code=503)), True)
+        assert _is_transient_error(atproto_exceptions.RequestException(Mock(status_code=429)), True)
+        assert not _is_transient_error(atproto_exceptions.RequestException(Mock(status_code=404)), True)
+    
+    def test_write_timeouts_not_retried(self, no_sleep):
+        """Edge case: A timed-out post may have landed, so it isn't re-sent."""
+        fn = Mock(side_effect=atproto_exceptions.InvokeTimeoutError())
+        
+        with pytest.raises(atproto_exceptions.InvokeTimeoutError):
+            _with_retries(fn, idempotent=False)
+        fn.assert_called_once()
+    
+    def test_write_dropped_connection_not_retried(self, no_sleep):
+        """Edge case: A post whose connection broke after sending isn't re-sent."""
+        error = atproto_exceptions.NetworkError()
+        error.__cause__ = httpx.ReadError('connection reset')
+        fn = Mock(side_effect=error)
+        
+        with pytest.raises(atproto_exceptions.NetworkError):
+            _with_retries(fn, idempotent=False)
+        fn.assert_called_once()
+    
+    def test_write_connect_failure_retried(self, no_sleep):
+        """Valid: A post that never connected is safe to retry."""
+        error = atproto_exceptions.NetworkError()
+        error.__cause__ = httpx.ConnectError('connection refused')
+        fn = Mock(side_effect=[error, 'ok'])
+        
+        assert _with_retries(fn, idempotent=False) == 'ok'
+        assert fn.call_count == 2
+    
+    def test_write_status_errors(self, no_sleep):
+        """Edge case: Writes retry a 429 rejection but not a 5xx or gateway error that may have landed."""
+        assert _is_transient_error(atproto_exceptions.RequestException(Mock(status_code=429)), False)
+        assert not _is_transient_error(atproto_exceptions.RequestException(Mock(status_code=500)), False)
+        assert not _is_transient_error(atproto_exceptions.NetworkError(Mock(status_code=502)), False)
+
+
+class TestClientPool:
+    """Test suite for sharing logged-in clients between platform instances."""
+    
+    @pytest.fixture(autouse=True)
+    def bluesky_env(self, monkeypatch):
+        monkeypatch.setenv('BLUESKY_ENABLE_POSTING', 'True')
+        monkeypatch.setenv('BLUESKY_HANDLE', 'streamer.bsky.social')
+        monkeypatch.setenv('BLUESKY_APP_PASSWORD', 'app-pass')
+        BlueskyPlatform.reset_pool()
+        yield
+        BlueskyPlatform.reset_pool()
+    
+    def test_second_instance_reuses_login(self):
+        """Valid: A re-created platform for the same handle doesn't log in again."""
+        with patch('stream_daemon.platforms.social.bluesky.Client') as client_cls:
+            first, second = BlueskyPlatform(), BlueskyPlatform()
+            assert first.authenticate() is True
+            assert second.authenticate() is True
+        
+        client_cls.assert_called_once()
+        client_cls.return_value.login.assert_called_once_with('streamer.bsky.social', 'app-pass')
+        assert second.client is first.client
+    
+    def test_failed_login_not_pooled(self):
+        """Invalid: A failed login is retried by the next authenticate()."""
+        with patch('stream_daemon.platforms.social.bluesky.Client') as client_cls:
+            client_cls.return_value.login.side_effect = [Exception('bad password'), None]
+            assert BlueskyPlatform().authenticate() is False
+            assert BlueskyPlatform().authenticate() is True
+        
+        assert client_cls.return_value.login.call_count == 2
+
+
+class TestEmbedFailures:
+    """Test suite for which embed failures cost the card and which surface as bugs."""
+    
+    @pytest.fixture
+    def platform(self):
+        _OG_CACHE.clear()
+        platform = BlueskyPlatform()
+        platform._http = Mock()
+        platform.client = Mock()
+        yield platform
+        _OG_CACHE.clear()
+    
+    def test_network_error_drops_card(self, platform):
+        """Invalid: A page that can't be fetched means no card, not a failed post."""
+        platform._fetch_html_head = Mock(side_effect=requests.ConnectionError('down'))
+        
+        assert platform._build_embed('https://example.com/page', None) is None
+    
+    def test_upload_error_drops_thumbnail(self, platform):
+        """Invalid: A failed blob upload leaves the card without an image."""
+        platform._download_thumbnail = Mock(return_value=b'img')
+        platform.client.upload_blob.side_effect = atproto_exceptions.BadRequestError()
+        
+        assert platform._upload_thumbnail('https://example.com/t.jpg') is None
+    
+    def test_blocked_site_without_stream_data(self, platform):
+        """Edge case: Kick links without stream metadata are never scraped."""
+        platform._fetch_og = Mock()
+        
+        assert platform._build_embed('https://kick.com/user', None) is None
+        platform._fetch_og.assert_not_called()
+    
+    def test_programming_errors_propagate(self, platform):
+        """Invalid: Bugs aren't silently swallowed as 'no card'."""
+        platform._fetch_og = Mock(side_effect=AttributeError('typo'))
+        
+        with pytest.raises(AttributeError):
+            platform._build_embed('https://example.com/page', None)
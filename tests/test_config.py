@@ -7,7 +7,8 @@ and secrets managers (Doppler, AWS Secrets Manager, HashiCorp Vault).
 
 import pytest
 import os
-from stream_daemon.config import get_config, get_secret, get_bool_config, get_int_config
+from unittest.mock import Mock, patch
+from stream_daemon.config import get_config, get_secret, get_bool_config, get_int_config, clear_secrets_cache
 
 
 class TestConfigLoading:
@@ -155,6 +156,60 @@ class TestSecretLoading:
             assert client_id != 'env_var_value', "Secrets manager should override environment variable"
 
 
+class TestSecretsCache:
+    """Test that secret bundles are fetched once, not once per key."""
+
+    @pytest.fixture(autouse=True)
+    def aws_env(self, monkeypatch):
+        monkeypatch.setenv('SECRETS_MANAGER', 'aws')
+        monkeypatch.setenv('SECRETS_AWS_TWITCH_SECRET_NAME', 'cache-test/twitch')
+        monkeypatch.delenv('DOPPLER_TOKEN', raising=False)
+        clear_secrets_cache()
+        yield
+        clear_secrets_cache()
+
+    def test_bundle_loaded_once_for_several_keys(self):
+        """Valid: Two keys from the same bundle cost one backend call."""
+        bundle = {'client_id': 'id-123', 'client_secret': 'shh'}
+        with patch('stream_daemon.config.secrets.load_secrets_from_aws', return_value=bundle) as load:
+            assert get_secret('Twitch', 'client_id', secret_name_env='SECRETS_AWS_TWITCH_SECRET_NAME') == 'id-123'
+            assert get_secret('Twitch', 'client_secret', secret_name_env='SECRETS_AWS_TWITCH_SECRET_NAME') == 'shh'
+
+        load.assert_called_once_with('cache-test/twitch')
+
+    def test_failed_load_not_cached(self):
+        """Edge case: An empty (failed) load is retried on the next lookup."""
+        with patch('stream_daemon.config.secrets.load_secrets_from_aws', side_effect=[{}, {'client_id': 'id-123'}]) as load:
+            get_secret('Twitch', 'client_id', secret_name_env='SECRETS_AWS_TWITCH_SECRET_NAME')
+            assert get_secret('Twitch', 'client_id', secret_name_env='SECRETS_AWS_TWITCH_SECRET_NAME') == 'id-123'
+
+        assert load.call_count == 2
+
+    def test_clear_forces_reload(self):
+        """Valid: clear_secrets_cache() picks up rotated secrets immediately."""
+        with patch('stream_daemon.config.secrets.load_secrets_from_aws', side_effect=[{'client_id': 'old'}, {'client_id': 'new'}]):
+            assert get_secret('Twitch', 'client_id', secret_name_env='SECRETS_AWS_TWITCH_SECRET_NAME') == 'old'
+            clear_secrets_cache()
+            assert get_secret('Twitch', 'client_id', secret_name_env='SECRETS_AWS_TWITCH_SECRET_NAME') == 'new'
+
+    def test_doppler_direct_keys_listed_once(self, monkeypatch):
+        """Valid: Unprefixed Doppler keys come from one cached listing, not one per lookup."""
+        monkeypatch.setenv('DOPPLER_TOKEN', 'dp.st.test')
+        monkeypatch.setenv('SECRETS_DOPPLER_GEMINI_SECRET_NAME', 'gemini')
+        sdk = Mock()
+        sdk.secrets.list.return_value = Mock(secrets={
+            'GEMINI_API_KEY': {'computed': 'gem-key'},
+            'OLLAMA_HOST': {'raw': 'http://ollama:11434'},
+        })
+
+        with patch('stream_daemon.config.secrets.DopplerSDK', return_value=sdk):
+            for key, expected in [('api_key', 'gem-key'), ('ollama_host', 'http://ollama:11434')]:
+                assert get_secret('Gemini', key, doppler_secret_env='SECRETS_DOPPLER_GEMINI_SECRET_NAME') == expected
+
+        # One listing for the 'gemini' prefix bundle, one for the direct-key lookups
+        assert sdk.secrets.list.call_count == 2
+
+
 class TestSecretMasking:
     """Test that secrets are properly masked in logs and output."""
     
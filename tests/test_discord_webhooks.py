@@ -0,0 +1,360 @@
+"""
+Tests for Discord webhook posting and live embed updates.
+
+No network - the pooled webhook session is mocked so we can check what
+actually gets sent to Discord.
+"""
+
+import json
+import threading
+import pytest
+from unittest.mock import Mock, patch
+from stream_daemon.utils import cache as cache_module
+from stream_daemon.platforms.social.discord import DiscordPlatform, _build_embed, _classify, _embed_base, _host_of
+
+
+WEBHOOK = 'https://discord.com/api/webhooks/123/abc'
+STREAM_DATA = {
+    'title': 'Ranked grind',
+    'viewer_count': 42,
+    'thumbnail_url': 'https://static-cdn.jtvnw.net/previews-ttv/live_user_test.jpg',
+    'game_name': 'Valorant',
+}
+
+
+def sent_payload(mock_method):
+    """Decode the JSON body of the last call to a mocked session method."""
+    return json.loads(mock_method.call_args.kwargs['data'])
+
+
+@pytest.fixture
+def platform():
+    """Discord platform with one default webhook and a mocked session."""
+    platform = DiscordPlatform()
+    platform.enabled = True
+    platform.webhook_url = WEBHOOK
+    platform._session = Mock()
+    platform._session.post.return_value = Mock(status_code=200, json=Mock(return_value={'id': '999'}))
+    platform._session.patch.return_value = Mock(status_code=200)
+    return platform
+
+
+class TestWebhookSession:
+    """Test suite for routing webhook calls through the pooled session."""
+
+    def test_post_uses_session(self, platform):
+        """Valid: Posting waits for the message ID and tracks it for updates."""
+        message_id = platform.post('Live now! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+
+        assert message_id == '999'
+        url = platform._session.post.call_args.args[0]
+        assert url == WEBHOOK + '?wait=true'
+        assert platform.active_messages.get('twitch')['message_id'] == '999'
+
+    def test_wait_url_respects_existing_query(self, platform):
+        """Edge case: A webhook that already has a query string gets &wait=true, built once."""
+        platform.webhook_url = WEBHOOK + '?thread_id=42'
+        platform.post('Live now!', platform_name='Twitch')
+        platform.post('Live again!', platform_name='Twitch')
+
+        assert platform._session.post.call_args.args[0] == WEBHOOK + '?thread_id=42&wait=true'
+        assert platform._wait_urls == {WEBHOOK + '?thread_id=42': WEBHOOK + '?thread_id=42&wait=true'}
+
+    def test_update_and_end_use_session(self, platform):
+        """Valid: Live updates and the final 'ended' edit PATCH the same message."""
+        platform.post('Live now! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+
+        assert platform.update_stream('Twitch', STREAM_DATA, 'https://twitch.tv/test') is True
+        assert platform.end_stream('Twitch', STREAM_DATA, 'https://twitch.tv/test') is True
+
+        edit_urls = [c.args[0] for c in platform._session.patch.call_args_list]
+        assert edit_urls == [f'{WEBHOOK}/messages/999'] * 2
+        assert 'twitch' not in platform.active_messages
+
+    def test_update_reuses_posted_embed_base(self, platform):
+        """Valid: Updates keep the posted title/url/color and refresh the live fields."""
+        platform.post('Live now! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+        posted = sent_payload(platform._session.post)['embeds'][0]
+
+        platform.update_stream('Twitch', dict(STREAM_DATA, viewer_count=1234, title='New title'), 'https://twitch.tv/test')
+        updated = sent_payload(platform._session.patch)['embeds'][0]
+
+        assert {k: updated[k] for k in ('title', 'url', 'color')} == {k: posted[k] for k in ('title', 'url', 'color')}
+        assert updated['description'] == 'New title'
+        assert updated['fields'][0]['value'] == '1,234'
+
+    def test_update_sends_only_changed_parts(self, platform):
+        """Valid: Live edits leave the posted content alone and skip empty embed keys."""
+        platform.post('Live now! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+        platform.update_stream('Twitch', {'title': '', 'viewer_count': 5}, 'https://twitch.tv/test')
+
+        payload = sent_payload(platform._session.patch)
+        assert 'content' not in payload
+        assert set(payload['embeds'][0]) == {'title', 'url', 'color', 'fields', 'footer'}
+
+    def test_payload_is_compact_utf8(self, platform):
+        """Valid: Bodies are compact UTF-8 JSON with emoji left unescaped."""
+        platform.post('Live now! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+        body = platform._session.post.call_args.kwargs['data']
+
+        assert isinstance(body, bytes)
+        assert '🟣 Live on Twitch'.encode('utf-8') in body
+        assert b'": ' not in body
+
+    def test_close_releases_session(self, platform):
+        """Valid: close() shuts the pooled session."""
+        platform.close()
+        platform._session.close.assert_called_once()
+
+
+class TestEmbedUpdates:
+    """Test suite for skipping and sending live embed updates."""
+
+    def test_unchanged_update_skipped(self, platform):
+        """Valid: Re-sending identical stream data is skipped until the refresh window passes."""
+        platform.post('Live! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+
+        assert platform.update_stream('Twitch', STREAM_DATA, 'https://twitch.tv/test') is True
+        assert platform.update_stream('Twitch', STREAM_DATA, 'https://twitch.tv/test') is True
+        assert platform._session.patch.call_count == 1
+
+        platform.active_messages.get('twitch')['last_update'] -= 3600
+        platform.update_stream('Twitch', STREAM_DATA, 'https://twitch.tv/test')
+        assert platform._session.patch.call_count == 2
+
+    def test_update_reads_clock_once(self, platform):
+        """Valid: Cache-buster and last_update come from the same timestamp."""
+        platform.post('Live! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+
+        with patch('stream_daemon.platforms.social.discord.time.time', side_effect=[1700000000.0]):
+            assert platform.update_stream('Twitch', STREAM_DATA, 'https://twitch.tv/test') is True
+
+        embed = sent_payload(platform._session.patch)['embeds'][0]
+        assert embed['image']['url'].endswith('_t=1700000000')
+        assert platform.active_messages.get('twitch')['last_update'] == 1700000000.0
+
+    def test_changed_update_sent(self, platform):
+        """Valid: A new viewer count always goes out."""
+        platform.post('Live! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+
+        platform.update_stream('Twitch', STREAM_DATA, 'https://twitch.tv/test')
+        platform.update_stream('Twitch', dict(STREAM_DATA, viewer_count=43), 'https://twitch.tv/test')
+        assert platform._session.patch.call_count == 2
+
+class TestClassify:
+    """Test suite for mapping stream URLs to embed colors and titles."""
+
+    def test_known_hosts(self):
+        """Valid: Exact hosts and subdomains map to their platform."""
+        assert _classify('https://www.twitch.tv/test')[:3] == ('twitch', 0x9146FF, '🟣 Live on Twitch')
+        assert _classify('https://youtu.be/abc')[0] == 'youtube'
+        assert _classify('https://m.youtube.com/watch?v=abc')[0] == 'youtube'
+        assert _classify('https://kick.com/test')[3:] == (0x42C814, '⏹️ Stream Ended - Kick')
+
+    def test_lookalike_hosts_rejected(self):
+        """Invalid: Lookalike domains don't borrow a platform's branding."""
+        assert _classify('https://eviltwitch.tv/test')[0] is None
+        assert _classify('https://kick.com.evil.net/test')[0] is None
+        assert _classify('https://eviltwitch.tv/test')[2] == 'Live Stream'
+
+    def test_host_of_matches_urlparse(self):
+        """Valid: Host extraction drops credentials, ports, paths and case."""
+        assert _host_of('https://WWW.Twitch.TV:443/test?x=1') == 'www.twitch.tv'
+        assert _host_of('https://twitch.tv.evil.com@kick.com/test') == 'kick.com'
+        assert _host_of('https://youtu.be?v=abc') == 'youtu.be'
+        assert _host_of('kick.com/test') == ''
+
+    def test_platform_key_fallback(self):
+        """Edge case: An unrecognised URL falls back to the platform name."""
+        assert _classify('https://example.com/live', 'youtube')[0] == 'youtube'
+        assert _classify(None, 'kick')[0] == 'kick'
+        assert _classify('not-a-url', 'myspace')[0] is None
+
+
+class TestQueuedUpdates:
+    """Test suite for background embed updates that don't block the check loop."""
+
+    def test_queue_updates_runs_in_background(self, platform):
+        """Valid: Updates are queued and land without the caller waiting on them."""
+        platform.post('Live! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+
+        assert platform.queue_updates([('Twitch', STREAM_DATA, 'https://twitch.tv/test')]) == 1
+        assert platform._pending_updates['twitch'].result(timeout=5) is True
+        platform._session.patch.assert_called_once()
+
+    def test_platforms_updated_concurrently(self, platform):
+        """Valid: Each posted platform gets its edit; an unposted one reports failure."""
+        platform.post('Live! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+        platform.post('Live! https://kick.com/test', platform_name='Kick', stream_data=STREAM_DATA)
+
+        assert platform.queue_updates([
+            ('Twitch', STREAM_DATA, 'https://twitch.tv/test'),
+            ('YouTube', STREAM_DATA, 'https://youtube.com/@test/live'),  # never posted
+            ('Kick', STREAM_DATA, 'https://kick.com/test'),
+        ]) == 3
+
+        results = {key: future.result(timeout=5) for key, future in platform._pending_updates.items()}
+        assert results == {'twitch': True, 'youtube': False, 'kick': True}
+        assert platform._session.patch.call_count == 2
+
+    def test_same_platform_sent_once(self, platform):
+        """Valid: Two streams on one platform share a message, so only the last edit goes out."""
+        platform.post('Live! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+        second = dict(STREAM_DATA, viewer_count=7)
+
+        assert platform.queue_updates([
+            ('Twitch', STREAM_DATA, 'https://twitch.tv/test'),
+            ('Twitch', second, 'https://twitch.tv/other'),
+        ]) == 1
+
+        assert platform._pending_updates['twitch'].result(timeout=5) is True
+        platform._session.patch.assert_called_once()
+        sent = sent_payload(platform._session.patch)['embeds'][0]
+        assert sent['url'] == 'https://twitch.tv/other'
+
+    def test_empty_update_list(self, platform):
+        """Edge case: Nothing to update means nothing queued."""
+        assert platform.queue_updates([]) == 0
+        platform._session.patch.assert_not_called()
+
+    def test_in_flight_update_not_queued_twice(self, platform):
+        """Edge case: A platform whose last update hasn't finished is skipped this tick."""
+        platform.post('Live! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+        release = threading.Event()
+        platform._session.patch.side_effect = lambda *a, **kw: release.wait(5) and Mock(status_code=200)
+
+        assert platform.queue_updates([('Twitch', STREAM_DATA, 'https://twitch.tv/test')]) == 1
+        assert platform.queue_updates([('Twitch', dict(STREAM_DATA, viewer_count=1), 'https://twitch.tv/test')]) == 0
+        release.set()
+        platform._pending_updates['twitch'].result(timeout=5)
+        assert platform._session.patch.call_count == 1
+
+    def test_end_stream_waits_for_pending_update(self, platform):
+        """Valid: The 'ended' edit goes out after a queued live update, never before it."""
+        platform.post('Live! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+        release = threading.Event()
+        titles = []
+
+        def patch(url, data, timeout):
+            if not titles:
+                release.wait(5)
+            titles.append(json.loads(data)['embeds'][0]['title'])
+            return Mock(status_code=200)
+
+        platform._session.patch.side_effect = patch
+        platform.queue_updates([('Twitch', STREAM_DATA, 'https://twitch.tv/test')])
+        threading.Timer(0.1, release.set).start()
+
+        assert platform.end_stream('Twitch', STREAM_DATA, 'https://twitch.tv/test') is True
+        assert titles == ['🟣 Live on Twitch', '⏹️ Stream Ended - Twitch']
+
+
+class TestBuildEmbed:
+    """Test suite for the shared live/update/ended embed builder."""
+
+    def test_live_embed(self):
+        """Valid: The initial post links the stream with plain thumbnail and footer."""
+        embed = _build_embed('live', _embed_base('live', 'https://twitch.tv/test'), 'Ranked grind', STREAM_DATA)
+
+        assert embed['title'] == '🟣 Live on Twitch'
+        assert embed['fields'][0] == {'name': '👥 Viewers', 'value': '42', 'inline': True}
+        assert embed['image'] == {'url': STREAM_DATA['thumbnail_url']}
+        assert embed['footer'] == {'text': 'Click to watch the stream!'}
+
+    def test_update_embed_cache_busts_thumbnail(self):
+        """Valid: Updates stamp the thumbnail URL and footer with the same time."""
+        embed = _build_embed('update', _embed_base('update', 'https://kick.com/test'), 'x', STREAM_DATA, now=1700000000)
+
+        assert embed['image']['url'].endswith('?_t=1700000000')
+        assert embed['footer']['text'].startswith('Last updated: ')
+
+    def test_ended_embed(self):
+        """Valid: Ended embeds use muted colors and report peak viewers."""
+        embed = _build_embed('ended', _embed_base('ended', 'https://youtube.com/watch?v=abc'), 'Bye', STREAM_DATA)
+
+        assert (embed['title'], embed['color']) == ('⏹️ Stream Ended - YouTube', 0xCC0000)
+        assert embed['fields'][0]['name'] == '👥 Peak Viewers'
+        assert embed['footer']['text'].endswith('• Click for VOD')
+
+    def test_empty_stream_data(self):
+        """Edge case: No stats means no fields, image or description."""
+        embed = _build_embed('update', _embed_base('update', 'https://kick.com/test'), '', {})
+
+        assert set(embed) == {'title', 'url', 'color', 'footer'}
+
+
+class TestMessageState:
+    """Test suite for bounding and persisting tracked Discord messages."""
+
+    def test_state_survives_restart(self, platform, tmp_path):
+        """Valid: A restarted daemon keeps editing the message it posted before."""
+        state_file = str(tmp_path / 'discord-state.json')
+        platform._state_file = state_file
+        platform.post('Live! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+
+        assert 'abc' not in open(state_file).read()  # webhook token never hits disk
+
+        restarted = DiscordPlatform()
+        restarted.webhook_url = WEBHOOK
+        restarted._state_file = state_file
+        restarted._load_state()
+
+        entry = restarted.active_messages.get('twitch')
+        assert entry['message_id'] == '999'
+        assert entry['webhook_url'] == WEBHOOK
+        assert entry['embed_base']['title'] == '🟣 Live on Twitch'
+
+    def test_ended_stream_removed_from_state(self, platform, tmp_path):
+        """Valid: Ending a stream drops it from the saved state too."""
+        platform._state_file = str(tmp_path / 'discord-state.json')
+        platform.post('Live! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+        platform.end_stream('Twitch', STREAM_DATA, 'https://twitch.tv/test')
+
+        restarted = DiscordPlatform()
+        restarted.webhook_url = WEBHOOK
+        restarted._state_file = platform._state_file
+        restarted._load_state()
+        assert len(restarted.active_messages) == 0
+
+    def test_stale_and_unreadable_state_ignored(self, platform, tmp_path):
+        """Edge case: Entries not updated for a day and corrupt files don't come back."""
+        platform._state_file = str(tmp_path / 'discord-state.json')
+        platform.post('Live! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+        msg_info = platform.active_messages.get('twitch')
+        msg_info['posted_at'] -= 2 * 86400
+        msg_info['last_update'] -= 2 * 86400
+        platform._save_state()
+
+        restarted = DiscordPlatform()
+        restarted.webhook_url = WEBHOOK
+        restarted._state_file = platform._state_file
+        restarted._load_state()
+        assert len(restarted.active_messages) == 0
+
+        (tmp_path / 'discord-state.json').write_text('not json')
+        restarted._load_state()
+        assert len(restarted.active_messages) == 0
+
+    def test_long_stream_stays_tracked(self, platform, monkeypatch):
+        """Edge case: Each update restarts the TTL, so a stream can run past a day."""
+        platform.post('Live! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+        clock = [cache_module.time.monotonic()]
+        monkeypatch.setattr(cache_module.time, 'monotonic', lambda: clock[0])
+
+        for viewers in (43, 44, 45):
+            clock[0] += 20 * 3600
+            assert platform.update_stream('Twitch', dict(STREAM_DATA, viewer_count=viewers), 'https://twitch.tv/test')
+
+        assert platform.end_stream('Twitch', STREAM_DATA, 'https://twitch.tv/test')
+
+    def test_update_after_end_not_resurrected(self, platform):
+        """Edge case: An update finishing after the stream ended doesn't bring the entry back."""
+        platform.post('Live! https://twitch.tv/test', platform_name='Twitch', stream_data=STREAM_DATA)
+
+        def end_mid_request(*args, **kwargs):
+            platform.clear_stream('Twitch')
+            return Mock(status_code=200)
+        platform._session.patch.side_effect = end_mid_request
+
+        platform.update_stream('Twitch', dict(STREAM_DATA, viewer_count=99), 'https://twitch.tv/test')
+        assert 'twitch' not in platform.active_messages
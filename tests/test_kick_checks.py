@@ -0,0 +1,319 @@
+"""
+Tests for Kick live checks.
+
+No network - the pooled Kick session is mocked so we can check what actually
+gets requested and how failures are counted.
+"""
+
+import pytest
+from unittest.mock import Mock
+from stream_daemon.platforms.streaming import kick
+from stream_daemon.platforms.streaming.kick import KickPlatform
+
+
+LIVE_PUBLIC = {
+    'data': {
+        'is_live': True,
+        'session_title': 'Speedrun practice',
+        'viewer_count': 321,
+        'thumbnail': {'url': 'https://images.kick.com/thumb.jpg'},
+        'category': {'name': 'Celeste'},
+    }
+}
+
+
+@pytest.fixture
+def platform():
+    """Enabled Kick platform on the public API with a mocked session."""
+    platform = KickPlatform()
+    platform.enabled = True
+    platform._session = Mock()
+    platform._session.get.return_value = Mock(status_code=200, json=Mock(return_value=LIVE_PUBLIC))
+    return platform
+
+
+class TestKickSession:
+    """Test suite for routing Kick calls through the pooled session."""
+
+    def test_public_check_uses_session(self, platform):
+        """Valid: Public checks go through the session and parse the livestream."""
+        is_live, stream_data = platform.is_live('streamer')
+
+        assert is_live is True
+        assert stream_data == {
+            'title': 'Speedrun practice',
+            'viewer_count': 321,
+            'thumbnail_url': 'https://images.kick.com/thumb.jpg',
+            'game_name': 'Celeste',
+        }
+        args, kwargs = platform._session.get.call_args
+        assert args[0] == 'https://kick.com/api/v2/channels/streamer/livestream'
+        assert kwargs['headers']['Referer'] == 'https://kick.com/'
+
+    def test_authenticated_check_sends_bearer(self, platform):
+        """Valid: Authenticated checks add the bearer token on top of the session headers."""
+        platform.use_auth = True
+        platform.access_token = 'kick-token'
+        platform._auth_headers = {'Authorization': 'Bearer kick-token'}
+        platform._token_expiry = float('inf')
+        platform._session.get.return_value = Mock(status_code=200, json=Mock(return_value={'data': []}))
+
+        assert platform.is_live('streamer') == (False, None)
+        kwargs = platform._session.get.call_args.kwargs
+        assert kwargs['headers'] == {'Authorization': 'Bearer kick-token'}
+        assert kwargs['params'] == {'slug': 'streamer'}
+
+    def test_request_headers_reused(self, platform):
+        """Valid: Per-call header dicts are built once, not on every poll."""
+        platform.is_live('a')
+        platform.is_live('b')
+        first, second = platform._session.get.call_args_list
+        assert first.kwargs['headers'] is second.kwargs['headers']
+
+    def test_session_has_browser_headers(self):
+        """Valid: The shared session carries the browser UA and JSON Accept header."""
+        platform = KickPlatform()
+        assert platform._session.headers['Accept'] == 'application/json'
+        assert 'Mozilla/5.0' in platform._session.headers['User-Agent']
+
+    def test_close_releases_session(self, platform):
+        """Valid: close() shuts the pooled session."""
+        platform.close()
+        platform._session.close.assert_called_once()
+
+
+class TestTokenRefresh:
+    """Test suite for keeping the Kick app token fresh."""
+
+    @pytest.fixture
+    def auth_platform(self, platform):
+        platform.use_auth = True
+        platform.access_token = 'old-token'
+        platform._auth_headers = {'Authorization': 'Bearer old-token'}
+        platform._client_id = 'id'
+        platform._client_secret = 'secret'
+        platform._session.post.return_value = Mock(
+            status_code=200, json=Mock(return_value={'access_token': 'new-token', 'expires_in': 3600}))
+        platform._session.get.return_value = Mock(status_code=200, json=Mock(return_value={'data': []}))
+        return platform
+
+    def test_refreshes_before_expiry(self, auth_platform):
+        """Valid: An expiring token is refreshed before the check, with a margin before the next one."""
+        auth_platform._token_expiry = 0.0
+        auth_platform.is_live('streamer')
+
+        auth_platform._session.post.assert_called_once()
+        assert auth_platform._session.get.call_args.kwargs['headers'] == {'Authorization': 'Bearer new-token'}
+        remaining = auth_platform._token_expiry - kick.time.monotonic()
+        assert 3600 - kick._TOKEN_REFRESH_MARGIN - 5 < remaining <= 3600 - kick._TOKEN_REFRESH_MARGIN
+
+    def test_fresh_token_not_refetched(self, auth_platform):
+        """Valid: A token with time left is used as-is."""
+        auth_platform._token_expiry = float('inf')
+        auth_platform.is_live('streamer')
+        auth_platform._session.post.assert_not_called()
+
+    def test_unauthorized_refreshes_and_retries(self, auth_platform):
+        """Valid: A 401 gets a new token and retries the authenticated check once."""
+        auth_platform._token_expiry = float('inf')
+        auth_platform._session.get.side_effect = [
+            Mock(status_code=401),
+            Mock(status_code=200, json=Mock(return_value={'data': []})),
+        ]
+
+        assert auth_platform.is_live('streamer') == (False, None)
+        auth_platform._session.post.assert_called_once()
+        assert auth_platform._session.get.call_count == 2
+        assert auth_platform._session.get.call_args.kwargs['headers'] == {'Authorization': 'Bearer new-token'}
+
+    def test_failed_refresh_falls_back_to_public(self, auth_platform):
+        """Invalid: If the token can't be refreshed, the public API is used for this check."""
+        auth_platform._token_expiry = 0.0
+        auth_platform._session.post.return_value = Mock(status_code=500)
+        auth_platform._session.get.return_value = Mock(status_code=200, json=Mock(return_value=LIVE_PUBLIC))
+
+        assert auth_platform.is_live('streamer')[0] is True
+        assert 'livestream' in auth_platform._session.get.call_args.args[0]
+
+
+class TestBatchCheck:
+    """Test suite for checking several Kick channels in one request."""
+
+    @pytest.fixture
+    def auth_platform(self, platform):
+        platform.use_auth = True
+        platform.access_token = 'kick-token'
+        platform._auth_headers = {'Authorization': 'Bearer kick-token'}
+        platform._token_expiry = float('inf')
+        platform._session.get.return_value = Mock(status_code=200, json=Mock(return_value={'data': [
+            {'slug': 'alice', 'stream_title': 'Ranked', 'category': {'name': 'Chess'},
+             'stream': {'is_live': True, 'viewer_count': 12, 'thumbnail': 'https://images.kick.com/a.jpg'}},
+            {'slug': 'bob', 'stream': {'is_live': False}},
+        ]}))
+        return platform
+
+    def test_one_request_for_all_channels(self, auth_platform):
+        """Valid: All slugs go out in a single request and results are matched back by slug."""
+        results = auth_platform.is_live_batch(['Alice', 'bob', 'ghost'])
+
+        auth_platform._session.get.assert_called_once()
+        assert auth_platform._session.get.call_args.kwargs['params'] == [('slug', 'Alice'), ('slug', 'bob'), ('slug', 'ghost')]
+        assert results['Alice'] == (True, {
+            'title': 'Ranked',
+            'viewer_count': 12,
+            'thumbnail_url': 'https://images.kick.com/a.jpg',
+            'game_name': 'Chess',
+        })
+        assert results['bob'] == (False, None)
+        assert results['ghost'] == (False, None)
+
+    def test_large_lists_are_chunked(self, auth_platform):
+        """Edge case: More slugs than one request allows are split across requests."""
+        usernames = [f'user{i}' for i in range(kick._MAX_SLUGS_PER_REQUEST + 1)]
+        auth_platform.is_live_batch(usernames)
+        assert auth_platform._session.get.call_count == 2
+
+    def test_failed_batch_falls_back_per_channel(self, auth_platform):
+        """Invalid: If the batch request fails, each channel is checked on its own."""
+        live_alice = auth_platform._session.get.return_value.json()['data'][:1]
+        auth_platform._session.get.side_effect = [
+            Mock(status_code=503),
+            Mock(status_code=200, json=Mock(return_value={'data': live_alice})),
+            Mock(status_code=200, json=Mock(return_value={'data': []})),
+        ]
+
+        results = auth_platform.is_live_batch(['alice', 'bob'])
+        assert auth_platform._session.get.call_count == 3
+        assert auth_platform._session.get.call_args.kwargs['params'] == {'slug': 'bob'}
+        assert results['alice'][0] is True
+        assert results['bob'] == (False, None)
+
+    def test_public_api_checks_one_by_one(self, platform):
+        """Valid: Without a token, batching is just is_live() per channel."""
+        results = platform.is_live_batch(['alice', 'bob'])
+        assert platform._session.get.call_count == 2
+        assert results['alice'][0] is True
+
+
+class TestRateLimitPacing:
+    """Test suite for slowing down before Kick's rate limit runs out."""
+
+    @pytest.fixture
+    def sleeps(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(kick.time, 'sleep', sleeps.append)
+        return sleeps
+
+    def test_low_remaining_waits_for_reset(self, platform, sleeps):
+        """Valid: Nearly exhausted quota delays the next request until the window resets."""
+        platform._session.get.return_value = Mock(
+            status_code=200, json=Mock(return_value=LIVE_PUBLIC),
+            headers={'X-RateLimit-Remaining': '1', 'X-RateLimit-Reset': '5'})
+        platform.is_live('a')
+        assert sleeps == []
+
+        platform.is_live('b')
+        assert len(sleeps) == 1 and 4 < sleeps[0] <= 5
+
+    def test_plenty_remaining_does_not_wait(self, platform, sleeps):
+        """Valid: Normal quota headers never delay polling."""
+        platform._session.get.return_value = Mock(
+            status_code=200, json=Mock(return_value=LIVE_PUBLIC),
+            headers={'X-RateLimit-Remaining': '50', 'X-RateLimit-Reset': '60'})
+        platform.is_live('a')
+        platform.is_live('b')
+        assert sleeps == []
+
+    def test_retry_after_is_capped(self, platform, sleeps):
+        """Edge case: A huge Retry-After on a 429 can't park the poll loop for long."""
+        platform._session.get.return_value = Mock(status_code=429, headers={'Retry-After': '3600'})
+        platform.is_live('a')
+        platform.is_live('b')
+        assert sleeps == [kick._RATE_LIMIT_MAX_WAIT]
+
+    def test_unparseable_headers_ignored(self, platform, sleeps):
+        """Invalid: HTTP-date Retry-After and junk counters are ignored."""
+        platform._session.get.return_value = Mock(
+            status_code=429, headers={'Retry-After': 'Wed, 21 Oct 2026 07:28:00 GMT', 'X-RateLimit-Remaining': 'many'})
+        platform.is_live('a')
+        platform.is_live('b')
+        assert sleeps == []
+
+
+class TestLiveCache:
+    """Test suite for coalescing repeat checks of the same channel."""
+
+    def test_repeat_check_uses_cache(self, platform):
+        """Valid: A second check within the TTL doesn't hit Kick again."""
+        first = platform.is_live('streamer')
+        assert platform.is_live('streamer') == first
+        platform._session.get.assert_called_once()
+
+    def test_batch_uses_and_fills_cache(self, platform):
+        """Valid: Batched checks skip cached channels and cache what they fetch."""
+        platform.use_auth = True
+        platform.access_token = 'kick-token'
+        platform._auth_headers = {'Authorization': 'Bearer kick-token'}
+        platform._token_expiry = float('inf')
+        platform._session.get.return_value = Mock(status_code=200, json=Mock(return_value={'data': []}))
+        platform._live_cache.set('alice', (False, None))
+
+        platform.is_live_batch(['alice', 'bob', 'carol'])
+        assert platform._session.get.call_args.kwargs['params'] == [('slug', 'bob'), ('slug', 'carol')]
+        platform.is_live('bob')
+        platform._session.get.assert_called_once()
+
+    def test_errors_not_cached(self, platform):
+        """Edge case: A failed check is retried on the next call."""
+        platform._session.get.side_effect = [ConnectionError('reset'), platform._session.get.return_value]
+        assert platform.is_live('streamer') == (False, None)
+        assert platform.is_live('streamer')[0] is True
+
+    def test_zero_ttl_disables_cache(self):
+        """Valid: cache_ttl=0 turns caching off."""
+        platform = KickPlatform(cache_ttl=0)
+        platform.enabled = True
+        platform._session = Mock()
+        platform._session.get.return_value = Mock(status_code=200, json=Mock(return_value=LIVE_PUBLIC))
+        platform.is_live('streamer')
+        platform.is_live('streamer')
+        assert platform._session.get.call_count == 2
+
+
+class TestErrorCooldown:
+    """Test suite for backing off after repeated Kick failures."""
+
+    def test_cooldown_starts_after_max_errors(self, platform):
+        """Edge case: Hitting the error limit starts a cooldown with no further requests."""
+        platform._session.get.side_effect = ConnectionError('connection reset')
+        for _ in range(platform.max_consecutive_errors):
+            assert platform.is_live('streamer') == (False, None)
+
+        calls = platform._session.get.call_count
+        assert platform.is_live('streamer') == (False, None)
+        assert platform.is_live('streamer') == (False, None)
+        assert platform.error_cooldown_time is not None
+        assert platform._session.get.call_count == calls
+
+    def test_cooldown_expires(self, platform, monkeypatch):
+        """Valid: Checks resume once the cooldown has passed."""
+        platform.consecutive_errors = platform.max_consecutive_errors
+        platform.error_cooldown_time = 1000.0
+        monkeypatch.setattr(kick.time, 'monotonic', lambda: 1000.0 + kick._ERROR_COOLDOWN_SECONDS + 1)
+
+        assert platform.is_live('streamer')[0] is True
+        assert platform.consecutive_errors == 0
+        assert platform.error_cooldown_time is None
+
+
+class TestKickRetry:
+    """Test suite for retrying transient Kick failures on the pooled adapter."""
+
+    def test_session_retries_transient_errors(self):
+        """Valid: Rate limits and 5xx are retried with capped backoff; Retry-After is left to _get()."""
+        retry = KickPlatform()._session.get_adapter('https://kick.com').max_retries
+        assert retry.total == 3
+        assert {429, 500, 502, 503, 504} <= set(retry.status_forcelist)
+        assert retry.respect_retry_after_header is False
+        assert retry.backoff_max == kick._KICK_BACKOFF_MAX
+        assert 'GET' in retry.allowed_methods and 'POST' in retry.allowed_methods
@@ -0,0 +1,182 @@
+"""
+Tests for Mastodon thumbnail attachments.
+
+No network - the Mastodon client and the thumbnail download are mocked.
+"""
+
+import threading
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+from stream_daemon.platforms.social import mastodon
+from stream_daemon.platforms.social.mastodon import MastodonPlatform, _thumbnail_ext
+
+
+THUMB_URL = 'https://static-cdn.jtvnw.net/previews-ttv/live_user_test.jpg'
+STREAM_DATA = {
+    'title': 'Ranked grind',
+    'viewer_count': 42,
+    'thumbnail_url': THUMB_URL,
+    'game_name': 'Valorant',
+}
+
+
+@pytest.fixture
+def platform():
+    """Enabled Mastodon platform with a mocked client."""
+    platform = MastodonPlatform()
+    platform.enabled = True
+    platform.client = Mock()
+    platform.client.media_post.return_value = {'id': 'media-1'}
+    platform.client.status_post.return_value = {'id': 101}
+    return platform
+
+
+def image_response(status_code=200, content=b'\xff\xd8jpeg', content_type='image/jpeg', etag=None):
+    """Build a fake thumbnail HTTP response."""
+    headers = {'content-type': content_type}
+    if etag:
+        headers['ETag'] = etag
+    response = MagicMock(status_code=status_code, headers=headers)
+    response.__enter__.return_value = response
+    response.iter_content.return_value = [content[:2], content[2:]]
+    return response
+
+
+class TestThumbnailCache:
+    """Test suite for reusing thumbnail downloads across a reply chain."""
+
+    def test_thumbnail_downloaded_once(self, platform):
+        """Valid: Two posts with the same thumbnail download it once but upload it twice."""
+        with patch('stream_daemon.platforms.social.mastodon._THUMB_SESSION.get', return_value=image_response()) as get:
+            assert platform.post('Live!', stream_data=STREAM_DATA) == '101'
+            assert platform.post('Still live!', reply_to_id='101', stream_data=STREAM_DATA) == '101'
+
+        get.assert_called_once()
+        # Media can only be attached to one status, so each post uploads its own
+        assert platform.client.media_post.call_count == 2
+
+    def test_failed_download_not_cached(self, platform):
+        """Edge case: A failed download is retried and the post goes out without media."""
+        with patch('stream_daemon.platforms.social.mastodon._THUMB_SESSION.get', side_effect=[image_response(status_code=404), image_response()]) as get:
+            platform.post('Live!', stream_data=STREAM_DATA)
+            assert platform.client.status_post.call_args.kwargs['media_ids'] is None
+            platform.post('Still live!', stream_data=STREAM_DATA)
+
+        assert get.call_count == 2
+        assert platform.client.status_post.call_args.kwargs['media_ids'] == ['media-1']
+
+    def test_stale_thumbnail_revalidated(self, platform):
+        """Valid: After the fresh window, a 304 reuses the cached bytes."""
+        with patch('stream_daemon.platforms.social.mastodon._THUMB_SESSION.get', side_effect=[image_response(etag='"v1"'), image_response(status_code=304, content=b'')]) as get:
+            platform.post('Live!', stream_data=STREAM_DATA)
+            entry = platform._thumb_cache.get(THUMB_URL)
+            platform._thumb_cache.set(THUMB_URL, entry[:4] + (entry[4] - 3600,))
+            platform.post('Still live!', stream_data=STREAM_DATA)
+
+        assert get.call_args.kwargs['headers']['If-None-Match'] == '"v1"'
+        assert platform.client.media_post.call_args.args[0].read() == b'\xff\xd8jpeg'
+
+    def test_changed_thumbnail_replaced(self, platform):
+        """Valid: A 200 on revalidation replaces the cached image."""
+        with patch('stream_daemon.platforms.social.mastodon._THUMB_SESSION.get', side_effect=[image_response(etag='"v1"'), image_response(content=b'new', etag='"v2"')]):
+            platform.post('Live!', stream_data=STREAM_DATA)
+            entry = platform._thumb_cache.get(THUMB_URL)
+            platform._thumb_cache.set(THUMB_URL, entry[:4] + (entry[4] - 3600,))
+            platform.post('Still live!', stream_data=STREAM_DATA)
+
+        assert platform.client.media_post.call_args.args[0].read() == b'new'
+        assert platform._thumb_cache.get(THUMB_URL)[2] == '"v2"'
+
+
+class TestThumbnailSession:
+    """Test suite for streaming thumbnails through the pooled CDN session."""
+
+    def test_streamed_and_closed(self, platform):
+        """Valid: The download is streamed in chunks and the response is released."""
+        response = image_response()
+        with patch('stream_daemon.platforms.social.mastodon._THUMB_SESSION.get', return_value=response) as get:
+            platform.post('Live!', stream_data=STREAM_DATA)
+
+        assert get.call_args.kwargs['stream'] is True
+        response.__exit__.assert_called_once()
+        assert platform.client.media_post.call_args.args[0].read() == b'\xff\xd8jpeg'
+
+
+class TestThumbnailTimeout:
+    """Test suite for not letting a slow thumbnail hold up the post."""
+
+    def test_slow_thumbnail_posts_without_media(self, platform):
+        """Edge case: An upload past the timeout falls back to a text-only status."""
+        release = threading.Event()
+        platform.client.media_post.side_effect = lambda *a, **kw: release.wait(5) and {'id': 'late'}
+
+        with patch('stream_daemon.platforms.social.mastodon._THUMB_SESSION.get', return_value=image_response()), \
+                patch('stream_daemon.platforms.social.mastodon._THUMB_UPLOAD_TIMEOUT', 0.1):
+            assert platform.post('Live!', stream_data=STREAM_DATA) == '101'
+        release.set()
+
+        assert platform.client.status_post.call_args.kwargs['media_ids'] is None
+
+    def test_close_stops_workers(self, platform):
+        """Valid: close() shuts the thumbnail pool down."""
+        platform.close()
+        with pytest.raises(RuntimeError):
+            platform._io_pool.submit(print)
+
+
+class TestInMemoryUpload:
+    """Test suite for uploading thumbnails without a temp file."""
+
+    @pytest.mark.parametrize('content_type,mime_type,file_name', [
+        ('image/jpeg', 'image/jpeg', 'thumbnail.jpg'),
+        ('image/png', 'image/png', 'thumbnail.png'),
+        ('image/webp', 'image/webp', 'thumbnail.webp'),
+        ('application/octet-stream', 'image/jpeg', 'thumbnail.jpg'),
+    ])
+    def test_upload_from_memory(self, platform, content_type, mime_type, file_name):
+        """Valid: The image bytes go to media_post as a file object with an explicit MIME type."""
+        with patch('stream_daemon.platforms.social.mastodon._THUMB_SESSION.get', return_value=image_response(content_type=content_type)):
+            platform.post('Live!', stream_data=dict(STREAM_DATA, thumbnail_url='https://example.com/thumb'))
+
+        args, kwargs = platform.client.media_post.call_args
+        assert args[0].read() == b'\xff\xd8jpeg'
+        assert kwargs['mime_type'] == mime_type
+        assert kwargs['file_name'] == file_name
+        assert kwargs['description'] == '🔴 LIVE • 42 viewers • Valorant'
+
+
+class TestThumbnailExtension:
+    """Test suite for picking the upload extension."""
+
+    @pytest.mark.parametrize('content_type,url,ext', [
+        ('image/png; charset=binary', 'https://example.com/thumb.jpg', '.png'),
+        ('IMAGE/WEBP', 'https://example.com/thumb', '.webp'),
+        ('application/octet-stream', 'https://example.com/thumb.JPEG?t=123', '.jpg'),
+        ('', 'https://example.com/live_user-1280x720.png?t=1', '.png'),
+        ('binary/octet-stream', 'https://example.com/thumb.gif', '.jpg'),
+    ])
+    def test_extension_lookup(self, content_type, url, ext):
+        """Valid: Content-Type wins, then the URL path suffix, then .jpg."""
+        assert _thumbnail_ext(content_type, url) == ext
+
+
+class TestThumbnailSizeCap:
+    """Test suite for refusing oversized thumbnails."""
+
+    def test_declared_oversize_skipped(self, platform):
+        """Invalid: A Content-Length over the cap is refused before reading the body."""
+        response = image_response()
+        response.headers['Content-Length'] = str(mastodon._THUMB_MAX_BYTES + 1)
+        with patch('stream_daemon.platforms.social.mastodon._THUMB_SESSION.get', return_value=response):
+            assert platform._download_thumbnail(THUMB_URL) is None
+        response.iter_content.assert_not_called()
+
+    def test_streamed_oversize_skipped(self, platform):
+        """Invalid: A body that outgrows the cap mid-stream is dropped and the post goes out without it."""
+        response = image_response()
+        response.iter_content.return_value = iter([b'x' * mastodon._THUMB_CHUNK_BYTES] * 200)
+        with patch('stream_daemon.platforms.social.mastodon._THUMB_SESSION.get', return_value=response):
+            assert platform.post('Live!', stream_data=STREAM_DATA) == '101'
+
+        platform.client.media_post.assert_not_called()
+        assert THUMB_URL not in platform._thumb_cache
@@ -0,0 +1,158 @@
+"""
+Tests for Matrix message posting.
+
+No network - the pooled homeserver session is mocked so we can check what
+actually gets sent.
+"""
+
+import json
+import pytest
+from unittest.mock import Mock
+from stream_daemon.platforms.base import SocialPlatform
+from stream_daemon.platforms.social.mastodon import MastodonPlatform
+from stream_daemon.platforms.social.matrix import MatrixPlatform
+
+
+HOMESERVER = 'https://matrix.example.org'
+ROOM_ID = '!room:example.org'
+
+
+@pytest.fixture
+def platform():
+    """Enabled Matrix platform with a static token and a mocked session."""
+    platform = MatrixPlatform()
+    platform.enabled = True
+    platform.homeserver = HOMESERVER
+    platform.room_id = ROOM_ID
+    platform.access_token = 'syt_token'
+    platform._session = Mock()
+    platform._session.put.return_value = Mock(status_code=200, json=Mock(return_value={'event_id': '$evt1'}))
+    return platform
+
+
+class TestHomeserverSession:
+    """Test suite for routing Matrix calls through the pooled session."""
+
+    def test_post_uses_session(self, platform):
+        """Valid: Messages go through the session with the bearer token."""
+        assert platform.post('Live now! https://twitch.tv/test') == '$evt1'
+
+        args, kwargs = platform._session.put.call_args
+        assert args[0].startswith(f'{HOMESERVER}/_matrix/client/r0/rooms/%21room%3Aexample.org/send/m.room.message/')
+        assert kwargs['headers'] == {'Authorization': 'Bearer syt_token'}
+
+    def test_login_uses_session(self, platform):
+        """Valid: Password login strips the MXID down to the localpart."""
+        platform.username = '@bot:example.org'
+        platform.password = 'hunter2'
+        platform._session.post.return_value = Mock(status_code=200, json=Mock(return_value={'access_token': 'fresh'}))
+
+        assert platform._login_and_get_token() == 'fresh'
+        login = json.loads(platform._session.post.call_args.kwargs['data'])
+        assert login['identifier']['user'] == 'bot'
+
+    def test_event_sent_as_compact_utf8(self, platform):
+        """Valid: The event body is compact JSON with emoji left as raw UTF-8."""
+        platform.post('🔴 Live now!')
+        body = platform._session.put.call_args.kwargs['data']
+        assert '🔴'.encode('utf-8') in body
+        assert b'\\u' not in body and b'": ' not in body
+
+    def test_each_message_gets_own_txn_id(self, platform):
+        """Valid: Every message is PUT under a fresh transaction ID."""
+        platform.post('first')
+        platform.post('second')
+        urls = [c.args[0] for c in platform._session.put.call_args_list]
+        assert urls[0] != urls[1]
+
+    def test_is_social_platform(self, platform):
+        """Valid: Matrix and Mastodon share the one SocialPlatform base class."""
+        assert isinstance(platform, SocialPlatform)
+        assert issubclass(MastodonPlatform, SocialPlatform)
+        assert MatrixPlatform().name == 'Matrix' and MatrixPlatform().enabled is False
+
+    def test_close_releases_session(self, platform):
+        """Valid: close() shuts the pooled session."""
+        platform.close()
+        platform._session.close.assert_called_once()
+
+
+class TestTokenCache:
+    """Test suite for reusing password-login tokens."""
+
+    @pytest.fixture
+    def login_platform(self, platform):
+        platform.username = '@bot:example.org'
+        platform.password = 'hunter2'
+        platform._session.post.return_value = Mock(status_code=200, json=Mock(return_value={'access_token': 'fresh'}))
+        return platform
+
+    def test_token_survives_restart(self, login_platform, tmp_path):
+        """Valid: A saved token is reused by the next process without logging in."""
+        login_platform._token_cache_file = str(tmp_path / 'matrix-token.json')
+        assert login_platform._login_and_get_token() == 'fresh'
+
+        restarted = MatrixPlatform()
+        restarted.homeserver = HOMESERVER
+        restarted.username = login_platform.username
+        restarted._session = Mock()
+        restarted._token_cache_file = login_platform._token_cache_file
+        restarted._load_token_cache()
+
+        assert restarted._login_and_get_token() == 'fresh'
+        restarted._session.post.assert_not_called()
+
+    def test_expired_token_not_reused(self, login_platform):
+        """Edge case: A token that expires almost immediately is not cached."""
+        login_platform._session.post.return_value = Mock(
+            status_code=200, json=Mock(return_value={'access_token': 'brief', 'expires_in_ms': 1000}))
+        assert login_platform._login_and_get_token() == 'brief'
+        assert login_platform._login_and_get_token() == 'brief'
+        assert login_platform._session.post.call_count == 2
+
+    def test_rejected_token_relogs_in(self, login_platform):
+        """Valid: A 401 drops the cached token, logs in again and resends once."""
+        login_platform._token_cache.set(login_platform._token_cache_key(), 'stale')
+        login_platform.access_token = 'stale'
+        login_platform._session.put.side_effect = [
+            Mock(status_code=401),
+            Mock(status_code=200, json=Mock(return_value={'event_id': '$evt2'})),
+        ]
+
+        assert login_platform.post('Live now!') == '$evt2'
+        login_platform._session.post.assert_called_once()
+        first, retry = login_platform._session.put.call_args_list
+        assert first.args[0] == retry.args[0]
+        assert retry.kwargs['headers'] == {'Authorization': 'Bearer fresh'}
+
+    def test_unreadable_cache_file_ignored(self, login_platform, tmp_path):
+        """Invalid: A corrupt cache file is ignored and the daemon logs in normally."""
+        cache_file = tmp_path / 'matrix-token.json'
+        cache_file.write_text('not json')
+        login_platform._token_cache_file = str(cache_file)
+        login_platform._load_token_cache()
+        assert login_platform._login_and_get_token() == 'fresh'
+
+
+class TestRichFormatting:
+    """Test suite for the HTML body built around the stream link."""
+
+    @pytest.mark.parametrize('url,header', [
+        ('https://www.twitch.tv/test', '🟣 Live on Twitch!'),
+        ('https://youtu.be/abc', '🔴 Live on YouTube!'),
+        ('https://KICK.com/test', '🟢 Live on Kick!'),
+    ])
+    def test_platform_header(self, platform, url, header):
+        """Valid: Known stream hosts get their platform header and a clickable link."""
+        platform.post(f'Live now! {url}')
+
+        event = json.loads(platform._session.put.call_args.kwargs['data'])
+        assert event['formatted_body'] == f'<p><strong>{header}</strong></p><p>Live now! <a href="{url}">{url}</a></p>'
+        assert event['body'] == f'Live now! {url}'
+
+    def test_lookalike_host_gets_no_header(self, platform):
+        """Invalid: Lookalike domains are linked but not branded."""
+        platform.post('Live now! https://twitch.tv.evil.com/test')
+
+        event = json.loads(platform._session.put.call_args.kwargs['data'])
+        assert event['formatted_body'].startswith('Live now! <a href=')
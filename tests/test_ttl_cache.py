@@ -0,0 +1,112 @@
+"""
+Tests for the in-process TTL cache used to avoid repeat scrapes and uploads.
+"""
+
+import pytest
+from unittest.mock import patch
+from stream_daemon.utils import TTLCache
+
+
+class TestTTLCache:
+    """Test suite for TTLCache expiry and eviction."""
+    
+    @pytest.fixture
+    def clock(self):
+        """Controllable monotonic clock."""
+        with patch('stream_daemon.utils.cache.time.monotonic') as monotonic:
+            monotonic.return_value = 1000.0
+            yield monotonic
+    
+    def test_get_and_set(self, clock):
+        """Valid: Stored values come back until they expire."""
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set('url', 'card')
+        
+        assert cache.get('url') == 'card'
+        assert 'url' in cache
+        assert cache.get('missing', 'default') == 'default'
+    
+    def test_expiry(self, clock):
+        """Valid: Entries vanish once their TTL has passed."""
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set('url', 'card')
+        
+        clock.return_value += 61
+        
+        assert cache.get('url') is None
+        assert 'url' not in cache
+        assert len(cache) == 0
+    
+    def test_lru_eviction(self, clock):
+        """Valid: The least recently used entry is evicted when full."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')  # 'b' is now the least recently used
+        cache.set('c', 3)
+        
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+    
+    def test_pop_and_clear(self, clock):
+        """Valid: Entries can be removed individually or all at once."""
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        
+        assert cache.pop('a') == 1
+        assert cache.pop('a', 'gone') == 'gone'
+        cache.clear()
+        assert len(cache) == 0
+    
+    def test_items_skips_expired(self, clock):
+        """Valid: items() lists only entries that are still live."""
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set('old', 1)
+        clock.return_value += 30
+        cache.set('new', 2)
+        clock.return_value += 40
+        
+        assert cache.items() == [('new', 2)]
+    
+    def test_falsy_values_cached(self, clock):
+        """Edge case: Falsy values are cache hits, not misses."""
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set('empty', '')
+        
+        assert 'empty' in cache
+        assert cache.get('empty', 'default') == ''
+    
+    def test_save_and_load_roundtrip(self, clock, tmp_path):
+        """Valid: Saved entries load into a fresh cache with their remaining TTL."""
+        path = tmp_path / 'cache.json'
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set('https://example.com', ('Title', 'Desc', None))
+        cache.save(str(path))
+        
+        restored = TTLCache(maxsize=4, ttl=60)
+        assert restored.load(str(path)) == 1
+        assert restored.get('https://example.com') == ['Title', 'Desc', None]
+        assert not list(tmp_path.glob('.cache-*'))  # temp file was swapped in, not left behind
+    
+    def test_load_skips_expired(self, clock, tmp_path):
+        """Edge case: Entries that expired while the daemon was down aren't loaded."""
+        path = tmp_path / 'cache.json'
+        with patch('stream_daemon.utils.cache.time.time', return_value=5000.0):
+            cache = TTLCache(maxsize=4, ttl=60)
+            cache.set('stale', 1)
+            cache.save(str(path))
+        
+        with patch('stream_daemon.utils.cache.time.time', return_value=5061.0):
+            restored = TTLCache(maxsize=4, ttl=60)
+            assert restored.load(str(path)) == 0
+        assert 'stale' not in restored
+    
+    def test_load_invalid_file(self, clock, tmp_path):
+        """Invalid: A corrupt cache file raises instead of loading garbage."""
+        path = tmp_path / 'cache.json'
+        path.write_text('{not json')
+        
+        with pytest.raises(ValueError):
+            TTLCache().load(str(path))